@@ -65,6 +65,7 @@ def main():
             include_package_data=True,
             install_requires=[
                     'BioPython',
+                    'numpy',
             ],
             options={
                     'bdist_wheel':
@@ -1,6 +1,1369 @@
-def concat_fasta_files(path_directory):
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+##################################################
+# Variables Globals
+##################################################
+_FASTA_BLOCK_SIZE = 1 << 20
+_FASTA_ENGINES = ("biopython", "native")
+_WRITE_BUFFER_SIZE = 1 << 20
+_PREFETCH_MAX_FILE_SIZE = 32 << 20
+_BGZF_BLOCK_SIZE = 65280
+_CACHE_VERSION = 2
+_CACHE_FASTA_MAGIC = b"YODAFA1\n"
+_CACHE_TWOBIT_MAGIC = b"YODA2B1\n"
+_CACHE_GFF_MAGIC = b"YODAGF2\n"
+_CACHE_KINDS = ("fasta", "fasta2bit", "gff")
+_TWOBIT_ENCODE = bytes({65: 0, 67: 1, 71: 2, 84: 3}.get(i, 0) for i in range(256))
+_TWOBIT_DECODE = bytes.maketrans(b"\x00\x01\x02\x03", b"ACGT")
+_REVCOMP = str.maketrans("ACGTURYSWKMBDHVNacgturyswkmbdhvn", "TGCAAYRSWMKVHDBNtgcaayrswmkvhdbn")
+_GFF_STRANDS = {"+": 1, "-": -1}
+_BGZF_EOF = b"\x1f\x8b\x08\x04\x00\x00\x00\x00\x00\xff\x06\x00BC\x02\x00\x1b\x00\x03\x00\x00\x00\x00\x00\x00\x00\x00\x00"
+
+
+##################################################
+# Private functions
+
+def _check_engine(engine):
+    """Raise ValueError if `engine` is not a known FASTA parsing engine"""
+    if engine not in _FASTA_ENGINES:
+        raise ValueError(f'ERROR: engine "{engine}" must be one of {", ".join(_FASTA_ENGINES)}')
+
+
+def _parse_fasta_record(record):
+    """Split raw record bytes (starting with '>') into an (id, description, sequence) tuple"""
+    end_title = record.find(b"\n")
+    if end_title == -1:
+        title, sequence = record[1:], b""
+    else:
+        title, sequence = record[1:end_title], record[end_title + 1:].translate(None, b" \t\r\n")
+    description = title.rstrip().decode()
+    seq_id = description.split(None, 1)[0] if description else ""
+    return seq_id, description, sequence.decode("latin-1")
+
+
+def _iter_fasta_handle(handle, block_size=_FASTA_BLOCK_SIZE):
     """
-    Return a fasta dictionnary of concatenation fasta file's find in directory ("fasta", "fa", "fas")
+    Block-buffered FASTA tokenizer over a binary handle.
+
+    Records are cut on "\\n>" boundaries found in each block, the pieces of a record spanning
+    several blocks are kept in a list and joined once, so long chromosomes stay linear.
+    Text before the first record is ignored.
+    """
+    read = handle.read
+    pieces = []
+    in_record = False
+    last_byte = b"\n"
+    while True:
+        block = read(block_size)
+        if not block:
+            break
+        pos = 0
+        if last_byte == b"\n" and block[:1] == b">":
+            boundary = 0
+        else:
+            boundary = block.find(b"\n>")
+            if boundary != -1:
+                boundary += 1
+        while boundary != -1:
+            pieces.append(block[pos:boundary])
+            if in_record:
+                yield _parse_fasta_record(b"".join(pieces))
+            in_record = True
+            pieces = []
+            pos = boundary
+            boundary = block.find(b"\n>", pos)
+            if boundary != -1:
+                boundary += 1
+        pieces.append(block[pos:])
+        last_byte = block[-1:]
+    if in_record:
+        yield _parse_fasta_record(b"".join(pieces))
+
+
+def _open_fasta(fasta_file, text=False):
+    """Open a fasta file in binary (or `text`) mode, with transparent gzip and BGZF decompression"""
+    import gzip
+    with open(fasta_file, "rb") as handle:
+        magic = handle.read(2)
+    if magic == b"\x1f\x8b":
+        return gzip.open(fasta_file, "rt" if text else "rb")
+    return open(fasta_file, "r" if text else "rb")
+
+
+def _open_fasta_source(fasta_file, buffer=None, text=False):
+    """
+    Open `fasta_file` like :func:`_open_fasta`, or its content `buffer` already read by :class:`PrefetchReader`.
+    A `buffer` exception (read error of the prefetch thread) is raised here.
+    """
+    import io
+    if buffer is None:
+        return _open_fasta(fasta_file, text)
+    if isinstance(buffer, BaseException):
+        raise buffer
+    return io.TextIOWrapper(io.BytesIO(buffer)) if text else io.BytesIO(buffer)
+
+
+def _read_file_bytes(fasta_file):
+    """Return the whole (decompressed) content of `fasta_file`, run on the :class:`PrefetchReader` threads"""
+    with _open_fasta(fasta_file) as handle:
+        return handle.read()
+
+
+def _is_bgzf(filename):
+    """Return True if `filename` is BGZF compressed (gzip member with the "BC" extra subfield)"""
+    with open(filename, "rb") as handle:
+        header = handle.read(16)
+    return header[:4] == b"\x1f\x8b\x08\x04" and header[12:14] == b"BC"
+
+
+class _BgzfReader:
+    """
+    Random access reader of a BGZF file from uncompressed offsets, using the (compressed offset, uncompressed
+    offset) start of each block as stored on a samtools ``.gzi`` index (plus the implicit first block (0, 0)).
+    """
+
+    def __init__(self, filename, blocks=None):
+        self.handle = open(filename, "rb")
+        self.blocks = blocks if blocks is not None else self.scan_blocks(self.handle)
+        self.uncompressed_offsets = [uoffset for _, uoffset in self.blocks]
+        self._cache_block = (None, b"")
+
+    @staticmethod
+    def scan_blocks(handle):
+        """Return the list of (compressed offset, uncompressed offset) of each block by reading block headers"""
+        import struct
+        blocks = []
+        coffset = uoffset = 0
+        while True:
+            handle.seek(coffset)
+            header = handle.read(18)
+            if len(header) < 18:
+                break
+            if header[:4] != b"\x1f\x8b\x08\x04":
+                raise ValueError(f'ERROR: "{handle.name}" is not a valid BGZF file')
+            block_size = struct.unpack_from("<H", header, 16)[0] + 1
+            handle.seek(coffset + block_size - 4)
+            isize = struct.unpack("<I", handle.read(4))[0]
+            if isize:
+                blocks.append((coffset, uoffset))
+            coffset += block_size
+            uoffset += isize
+        return blocks or [(0, 0)]
+
+    def _read_block(self, index):
+        """Return the uncompressed data of block number `index`"""
+        import struct
+        import zlib
+        if self._cache_block[0] == index:
+            return self._cache_block[1]
+        self.handle.seek(self.blocks[index][0])
+        header = self.handle.read(12)
+        xlen = struct.unpack_from("<H", header, 10)[0]
+        extra = self.handle.read(xlen)
+        block_size = struct.unpack_from("<H", extra, extra.find(b"BC") + 4)[0] + 1
+        data = zlib.decompress(self.handle.read(block_size - 12 - xlen - 8), -15)
+        self._cache_block = (index, data)
+        return data
+
+    def read(self, uoffset, size):
+        """Return `size` uncompressed bytes from uncompressed offset `uoffset`"""
+        from bisect import bisect_right
+        index = bisect_right(self.uncompressed_offsets, uoffset) - 1
+        pieces = []
+        position = uoffset - self.blocks[index][1]
+        while size > 0 and index < len(self.blocks):
+            data = self._read_block(index)[position:position + size]
+            pieces.append(data)
+            size -= len(data)
+            position = 0
+            index += 1
+        return b"".join(pieces)
+
+    def close(self):
+        self.handle.close()
+
+
+def _format_fasta_record(description, sequence, wrap=60):
+    """Return a fasta formatted record, sequence lines are wrapped at `wrap` characters (0 or None for one line)"""
+    if not wrap:
+        return ">" + description + "\n" + (sequence + "\n" if sequence else "")
+    lines = [sequence[i:i + wrap] for i in range(0, len(sequence), wrap)]
+    return ">" + description + "\n" + "".join(line + "\n" for line in lines)
+
+
+class _BgzfWriter:
+    """
+    Minimal BGZF writer: data are cut in blocks of at most 65280 bytes, each one compressed as an independent
+    gzip member with the "BC" extra field giving its size, and the file end with the standard empty EOF block.
+    """
+
+    def __init__(self, filename, compresslevel=6):
+        self.handle = open(filename, "wb")
+        self.name = self.handle.name
+        self.compresslevel = compresslevel
+        self.buffer = bytearray()
+
+    def _write_block(self, data):
+        import struct
+        import zlib
+        compressor = zlib.compressobj(self.compresslevel, zlib.DEFLATED, -15)
+        cdata = compressor.compress(data) + compressor.flush()
+        self.handle.write(b"\x1f\x8b\x08\x04\x00\x00\x00\x00\x00\xff\x06\x00BC\x02\x00" +
+                          struct.pack("<H", len(cdata) + 25) + cdata +
+                          struct.pack("<II", zlib.crc32(data) & 0xffffffff, len(data)))
+
+    def write(self, data):
+        self.buffer += data
+        if len(self.buffer) >= _BGZF_BLOCK_SIZE:
+            view = memoryview(self.buffer)
+            start = 0
+            while len(self.buffer) - start >= _BGZF_BLOCK_SIZE:
+                self._write_block(view[start:start + _BGZF_BLOCK_SIZE])
+                start += _BGZF_BLOCK_SIZE
+            view.release()
+            del self.buffer[:start]
+        return len(data)
+
+    def close(self):
+        if self.buffer:
+            self._write_block(bytes(self.buffer))
+            self.buffer = bytearray()
+        self.handle.write(_BGZF_EOF)
+        self.handle.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def _output_compression(path, compress=None):
+    """Return the compression of an output `path`: `compress` if set, else guess from the ".gz" or ".bgz" suffix"""
+    if compress is None:
+        return {".gz": "gzip", ".bgz": "bgzf"}.get(path.suffix)
+    if compress and compress not in ("gzip", "bgzf"):
+        raise ValueError(f'ERROR: compress "{compress}" must be "gzip", "bgzf" or False')
+    return compress or None
+
+
+class _OutputHandle:
+    """
+    Context manager giving a write function for a path or an already open handle.
+
+    Paths ending with ".gz" are gzip compressed and ".bgz" BGZF compressed (or as set with `compress`).
+    An open handle is not closed at exit. The write function take str, or bytes if `binary` is True,
+    and convert them as utf-8 if the handle does not have the same mode.
+    """
+
+    def __init__(self, output, binary=False, compress=None):
+        self.output = output
+        self.binary = binary
+        self.compress = compress
+        self.handle = None
+
+    def __enter__(self):
+        import gzip
+        import io
+        from pathlib import Path
+        if hasattr(self.output, "write"):
+            if isinstance(self.output, io.TextIOBase) != self.binary:
+                return self.output.write
+            if self.binary:
+                return lambda data: self.output.write(data.decode())
+            return lambda text: self.output.write(text.encode())
+        path = Path(self.output).resolve()
+        compress = _output_compression(path, self.compress)
+        if compress == "gzip":
+            self.handle = gzip.open(path, "wb", compresslevel=6)
+        elif compress == "bgzf":
+            self.handle = _BgzfWriter(path)
+        else:
+            self.handle = open(path, "wb", buffering=_WRITE_BUFFER_SIZE)
+        if not self.binary:
+            return lambda text: self.handle.write(text.encode())
+        return self.handle.write
+
+    def __exit__(self, *args):
+        if self.handle is not None:
+            self.handle.close()
+
+
+def _scan_fasta_lengths(buffer, window=_FASTA_BLOCK_SIZE * 8):
+    """
+    Yield (id, length) of each record of a fasta bytes-like `buffer` (ie mmap) by counting residue bytes
+    between headers, the sequence region is read by fixed windows so no sequence string is built.
+    """
+    size = len(buffer)
+    if buffer[:1] == b">":
+        header = 0
+    else:
+        header = buffer.find(b"\n>")
+        if header == -1:
+            return
+        header += 1
+    while True:
+        end_title = buffer.find(b"\n", header)
+        if end_title == -1:
+            end_title = size
+        title = buffer[header + 1:end_title].rstrip().decode()
+        next_header = buffer.find(b"\n>", end_title)
+        end_record = size if next_header == -1 else next_header + 1
+        length = 0
+        for start in range(end_title + 1, end_record, window):
+            length += len(buffer[start:min(start + window, end_record)].translate(None, b" \t\r\n"))
+        yield title.split(None, 1)[0] if title else "", length
+        if next_header == -1:
+            break
+        header = end_record
+
+
+def _sequence_2_str(sequence):
+    """Return `sequence` (``str``, ``bytes``, ``Seq`` or ``SeqRecord``) as str"""
+    if isinstance(sequence, str):
+        return sequence
+    if isinstance(sequence, (bytes, bytearray)):
+        return sequence.decode("latin-1")
+    if hasattr(sequence, "seq"):
+        return str(sequence.seq)
+    return str(sequence)
+
+
+def _alignment_2_str(dico):
+    """Return a copy of `dico` with str sequences, raise ValueError if the sequences are not aligned"""
+    sequences = {seq_name: _sequence_2_str(seq) for seq_name, seq in dico.items()}
+    if len(set(map(len, sequences.values()))) > 1:
+        raise ValueError("Sequences must all be the same length")
+    return sequences
+
+
+def _guess_datatype(sequences):
+    """Return the nexus datatype of `sequences`: "protein" unless only IUPAC nucleotides and gaps are found"""
+    nucleotides = set("ACGTUNRYKMSWBDHVacgtunrykmswbdhv-?.")
+    for seq in sequences:
+        if not set(seq) <= nucleotides:
+            return "protein"
+    return "dna"
+
+
+def _nexus_name(name):
+    """Quote a nexus name if it contains space or punctuation"""
+    if name and not any(char.isspace() or char in "()[]{}/\\,;:=*'\"`+<>-" for char in name):
+        return name
+    return "'" + name.replace("'", "''") + "'"
+
+
+def _output_name(output):
+    """Return the file name of an output path or handle"""
+    from pathlib import Path
+    if hasattr(output, "write"):
+        return getattr(output, "name", None)
+    return Path(output).resolve().as_posix()
+
+
+def _get_cache(cache):
+    """Return the :class:`ParseCache` to use for a `cache` argument (None, False, True or a ParseCache)"""
+    if cache is True:
+        return ParseCache()
+    return cache or None
+
+
+def _fasta_records_cached(fasta_file, cache):
+    """
+    Return the list of (id, description, sequence) of `fasta_file`, loaded from `cache` if possible, else parsed
+    with the native tokenizer and stored. A fasta entry is a JSON index (ids, descriptions, lengths) followed by
+    all the sequences concatenated.
+    """
+    import json
+    import struct
+
+    buffer = cache.load(fasta_file, "fasta")
+    if buffer is not None:
+        with buffer:
+            index_size, = struct.unpack_from("<Q", buffer, len(_CACHE_FASTA_MAGIC))
+            start = len(_CACHE_FASTA_MAGIC) + 8
+            index = json.loads(buffer[start:start + index_size])
+            position = start + index_size
+            records = []
+            for seq_id, description, length in zip(index["ids"], index["descriptions"], index["lengths"]):
+                records.append((seq_id, description, buffer[position:position + length].decode("latin-1")))
+                position += length
+        return records
+
+    with _open_fasta(fasta_file) as handle:
+        records = list(_iter_fasta_handle(handle))
+    index = json.dumps({"ids"         : [record[0] for record in records],
+                        "descriptions": [record[1] for record in records],
+                        "lengths"     : [len(record[2]) for record in records]}).encode()
+    cache.store(fasta_file, "fasta", b"".join([_CACHE_FASTA_MAGIC, struct.pack("<Q", len(index)), index,
+                                               *(record[2].encode("latin-1") for record in records)]))
+    return records
+
+
+def _cache_sections(magic, header, sections):
+    """
+    Return a cache entry: `magic`, the size of the JSON `header`, the header then the bytes-like `sections`, each
+    one padded to 8 bytes so they can be cast to 64-bit arrays once mapped. The sizes of the sections are added to
+    the header with the byte order.
+    """
+    import json
+    import struct
+    import sys
+
+    header = json.dumps({**header, "byteorder": sys.byteorder,
+                         "sizes": [memoryview(section).nbytes for section in sections]}).encode()
+    header += b" " * (-(len(magic) + 8 + len(header)) % 8)
+    pieces = [magic, struct.pack("<Q", len(header)), header]
+    for section in sections:
+        pieces.append(section)
+        pieces.append(b"\x00" * (-memoryview(section).nbytes % 8))
+    return b"".join(pieces)
+
+
+def _cache_sections_load(buffer, magic, typecodes):
+    """
+    Read an entry of :func:`_cache_sections` from the mapped `buffer`. Return the header dict and the sections as
+    memoryviews on the buffer cast to `typecodes` (no copy), or None if the entry is not valid.
+    """
+    import json
+    import struct
+    import sys
+
+    if buffer[:len(magic)] != magic:
+        return None
+    header_size, = struct.unpack_from("<Q", buffer, len(magic))
+    position = len(magic) + 8
+    header = json.loads(buffer[position:position + header_size])
+    if header["byteorder"] != sys.byteorder or len(header["sizes"]) != len(typecodes):
+        return None
+    position += header_size
+    with memoryview(buffer) as view:
+        sections = []
+        for size, typecode in zip(header["sizes"], typecodes):
+            sections.append(view[position:position + size].cast(typecode))
+            position += size + (-size % 8)
+    return header, sections
+
+
+def _gff_rows_2_cache(rows):
+    """
+    Return the cache entry of the GFF `rows` (with a raw attribute column): the columns are stored as plain
+    arrays (codes on category lists for seqid, source, type, strand and phase) and the attribute strings
+    concatenated with their offsets (in characters), nothing is pickled.
+    """
+    from array import array
+
+    categories = {field: {} for field in ("seqid", "source", "type", "strand", "phase")}
+    codes = array("i")
+    starts, ends = array("q"), array("q")
+    scores = array("d")
+    offsets = array("Q", [0])
+    attributes = []
+    position = 0
+    for row in rows:
+        for field, value in zip(categories, (row[0], row[1], row[2], row[6], row[7])):
+            codes.append(-1 if value is None else categories[field].setdefault(value, len(categories[field])))
+        starts.append(-1 if row[3] is None else row[3])
+        ends.append(-1 if row[4] is None else row[4])
+        scores.append(float("nan") if row[5] is None else row[5])
+        attributes.append(row[8])
+        position += len(row[8])
+        offsets.append(position)
+    header = {"categories": {field: list(names) for field, names in categories.items()}}
+    return _cache_sections(_CACHE_GFF_MAGIC, header, [codes, starts, ends, scores, offsets,
+                                                      "".join(attributes).encode()])
+
+
+def _gff_cache_2_rows(buffer):
+    """
+    Yield the GFF rows of a cache entry of :func:`_gff_rows_2_cache` read on the mapped `buffer`, which is closed
+    once consumed. Return None (and close `buffer`) if the entry is not valid.
+    """
+    import math
+
+    entry = _cache_sections_load(buffer, _CACHE_GFF_MAGIC, ("i", "q", "q", "d", "Q", "B"))
+    if entry is None:
+        buffer.close()
+        return None
+    header, sections = entry
+    seqids, sources, types, strands, phases = (header["categories"][field] + [None]
+                                               for field in ("seqid", "source", "type", "strand", "phase"))
+
+    def rows():
+        from itertools import repeat
+        try:
+            codes = sections[0].tolist()
+            starts = [None if start == -1 else start for start in sections[1].tolist()]
+            ends = [None if end == -1 else end for end in sections[2].tolist()]
+            lengths = [None if start is None or end is None else end - start for start, end in zip(starts, ends)]
+            scores = [None if math.isnan(score) else score for score in sections[3].tolist()]
+            attributes = str(sections[5], "utf-8")
+            offsets = sections[4].tolist()
+            # a code -1 (".") select the trailing None of the category lists
+            yield from zip(map(seqids.__getitem__, codes[0::5]), map(sources.__getitem__, codes[1::5]),
+                           map(types.__getitem__, codes[2::5]), starts, ends, scores,
+                           map(strands.__getitem__, codes[3::5]), map(phases.__getitem__, codes[4::5]),
+                           map(attributes.__getitem__, map(slice, offsets[:-1], offsets[1:])),
+                           repeat(None), lengths)
+        finally:
+            for section in sections:
+                section.release()
+            buffer.close()
+
+    return rows()
+
+
+def _sequence_store_cached(fasta_file, cache):
+    """
+    Return the :class:`SequenceStore` of `fasta_file`, with its packed buffers mapped from `cache` if possible,
+    else built and stored.
+    """
+    buffer = cache.load(fasta_file, "fasta2bit")
+    if buffer is not None:
+        store = SequenceStore._from_cache(buffer)
+        if store is not None:
+            return store
+    store = SequenceStore.from_fasta(fasta_file)
+    cache.store(fasta_file, "fasta2bit", store._to_cache())
+    return store
+
+
+def _fasta_tuples_2_dict(records):
+    """Build an id to sequence dict from (id, description, sequence) tuples, refusing duplicated ids"""
+    dico_seqs = {}
+    for seq_id, _, sequence in records:
+        if seq_id in dico_seqs:
+            raise ValueError(f"Duplicate key '{seq_id}'")
+        dico_seqs[seq_id] = sequence
+    return dico_seqs
+
+
+def _concat_fasta_files_2_file(fasta_files_list, output, out_format, engine, workers, gap, prefetch):
+    """
+    Out-of-core backend of :func:`concat_fasta_files`: write the concatenation of `fasta_files_list` on
+    pre-sized slots of `output` and return the output file name
+    """
+    from pathlib import Path
+
+    taxa = {}
+    genes_length = []
+    for ids, lengths in _map_files(_fasta_lengths_file, fasta_files_list, workers, prefetch):
+        genes_length.append(max(lengths, default=0))
+        for seq_name in sorted(ids):
+            taxa.setdefault(seq_name, None)
+    concat_length = sum(genes_length)
+
+    output = Path(output).resolve()
+    slots = {}
+    position = 0
+    with open(output, "wb") as output_handle:
+        if out_format == "phylip":
+            header = f"{len(taxa)} {concat_length}\n".encode()
+            output_handle.write(header)
+            position += len(header)
+        for seq_name in taxa:
+            name = (f">{seq_name}\n" if out_format == "fasta" else f"{seq_name} ").encode()
+            output_handle.seek(position)
+            output_handle.write(name)
+            slots[seq_name] = position + len(name)
+            position = slots[seq_name] + concat_length
+            output_handle.seek(position)
+            output_handle.write(b"\n")
+            position += 1
+
+    with open(output, "r+b", buffering=0) as output_handle:
+        gene_start = 0
+        for record_dict, gene_length in zip(_map_files(_read_fasta_file, fasta_files_list, 1, prefetch, engine),
+                                            genes_length):
+            gene_gap = (gap * gene_length).encode("latin-1")
+            for seq_name, slot in slots.items():
+                output_handle.seek(slot + gene_start)
+                if seq_name in record_dict:
+                    output_handle.write(record_dict[seq_name].ljust(gene_length, gap).encode("latin-1"))
+                else:
+                    output_handle.write(gene_gap)
+            gene_start += gene_length
+    return output.as_posix()
+
+
+def _convert_fasta_2_nexus_file(fasta_file, path_directory_out, buffer=None):
+    """Convert one aligned fasta file (or its prefetched `buffer`) to `path_directory_out`/<basename>.nex"""
+    from pathlib import Path
+
+    basename = _fasta_file_stem(Path(fasta_file).name) or Path(fasta_file).stem
+    record_dict = _read_fasta_file(fasta_file, buffer=buffer)
+    if not record_dict:
+        raise ValueError("No records found in handle")
+    nexus_dict = {}
+    for seq_name, seq in record_dict.items():
+        nexus_name = seq_name.replace("-", "_")
+        if nexus_name in nexus_dict:
+            raise ValueError(f'ERROR: ID "{seq_name}" of "{fasta_file}" is not unique once "-" replaced by "_"')
+        nexus_dict[nexus_name] = seq
+    dict_2_nexus(nexus_dict, f"{Path(path_directory_out).as_posix()}/{basename}.nex", interleave=False)
+
+
+def _convert_fasta_2_nexus_batch(fasta_file, path_directory_out, buffer=None):
+    """Batch mode worker of :func:`convert_fasta_2_nexus`, return the conversion status instead of raising"""
+    try:
+        _convert_fasta_2_nexus_file(fasta_file, path_directory_out, buffer)
+        return "converted"
+    except Exception as e:
+        return f"ERROR: {e}"
+
+
+def _count_fasta_records(fasta_file, buffer=None, block_size=_FASTA_BLOCK_SIZE * 8):
+    """Return the number of records of `fasta_file` by counting ">" at line starts on binary chunks"""
+    count = 0
+    last_byte = b"\n"
+    with _open_fasta_source(fasta_file, buffer) as handle:
+        while True:
+            block = handle.read(block_size)
+            if not block:
+                break
+            count += block.count(b"\n>") + (last_byte == b"\n" and block[:1] == b">")
+            last_byte = block[-1:]
+    return count
+
+
+def _fasta_file_stem(name):
+    """
+    Return the file `name` without its fasta extension (".fasta", ".fa" or ".fas", optionally followed by ".gz" or
+    ".bgz"), or None if it is not a fasta file name
+    """
+    stem, _, extension = name.rpartition(".")
+    if extension.lower() in ("gz", "bgz"):
+        stem, _, extension = stem.rpartition(".")
+    return stem if stem and extension.lower() in ("fasta", "fa", "fas") else None
+
+
+def _fasta_files_in(path_directory):
+    """Return the sorted list of the fasta files of `path_directory` (see :func:`_fasta_file_stem`)"""
+    return sorted(fasta_file for fasta_file in path_directory.glob("*") if fasta_file.is_file() and
+                  _fasta_file_stem(fasta_file.name) is not None)
+
+
+def _assembly_stats_file(fasta_file, buffer=None):
+    """Return the statistics dict of :func:`assembly_stats` for one fasta file (or its prefetched `buffer`)"""
+    import numpy as np
+
+    lengths = []
+    counts = np.zeros(256, dtype=np.int64)
+    batch = []
+    batch_size = 0
+    with _open_fasta_source(fasta_file, buffer) as handle:
+        for _, _, sequence in _iter_fasta_handle(handle):
+            lengths.append(len(sequence))
+            batch.append(sequence)
+            batch_size += len(sequence)
+            if batch_size >= _FASTA_BLOCK_SIZE * 8:
+                counts += np.bincount(np.frombuffer("".join(batch).encode("latin-1"), dtype=np.uint8), minlength=256)
+                batch = []
+                batch_size = 0
+    counts += np.bincount(np.frombuffer("".join(batch).encode("latin-1"), dtype=np.uint8), minlength=256)
+    counts[ord("A"):ord("Z") + 1] += counts[ord("a"):ord("z") + 1]
+    counts[ord("a"):ord("z") + 1] = 0
+
+    lengths = np.sort(np.array(lengths, dtype=np.int64))[::-1]
+    total = int(lengths.sum())
+    stats = {"NUM": len(lengths), "MIN": int(lengths[-1]) if total else 0, "MAX": int(lengths[0]) if total else 0}
+    cumulative = np.cumsum(lengths)
+    for percent in (50, 90):
+        index = int(np.searchsorted(cumulative, total * percent / 100)) if total else 0
+        stats[f"N{percent} BP"] = int(lengths[index]) if total else 0
+        stats[f"N{percent} NUM"] = index + 1 if total else 0
+    bases = {base: int(counts[ord(base)]) for base in "ACGTN"}
+    acgt = bases["A"] + bases["C"] + bases["G"] + bases["T"]
+    stats["TOTAL"] = total
+    stats["MEAN"] = round(total / len(lengths), 2) if len(lengths) else 0
+    stats["GC %"] = round((bases["G"] + bases["C"]) * 100 / acgt, 2) if acgt else 0
+    stats["N %"] = round(bases["N"] * 100 / total, 2) if total else 0
+    stats.update(bases)
+    stats["OTHER"] = total - acgt - bases["N"]
+    return stats
+
+
+def _check_workers(workers):
+    """Raise ValueError if `workers` is not a positive integer"""
+    if not isinstance(workers, int) or isinstance(workers, bool) or workers < 1:
+        raise ValueError(f'ERROR: workers "{workers}" must be a positive integer')
+
+
+def _check_wrap(wrap):
+    """Raise ValueError if `wrap` is not None, 0 or a positive integer"""
+    if wrap is not None and (not isinstance(wrap, int) or isinstance(wrap, bool) or wrap < 0):
+        raise ValueError(f'ERROR: wrap "{wrap}" must be a positive integer, 0 or None')
+
+
+def _map_workers(function, iterable, workers, *args):
+    """
+    Ordered map of `function(item, *args)` over `iterable`, in a pool of `workers` processes if workers > 1.
+    `function` must be a module level function so it can be pickled.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from itertools import repeat
+
+    items = list(iterable)
+    args_lists = [repeat(arg, len(items)) for arg in args]
+    if workers == 1 or len(items) < 2:
+        yield from map(function, items, *args_lists)
+        return
+    chunksize = max(1, len(items) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(function, items, *args_lists, chunksize=chunksize)
+
+
+def _read_fasta_file(fasta_file, engine="native", buffer=None):
+    """Return the id to sequence str dict of `fasta_file` (or its prefetched `buffer`) read with `engine`"""
+    if engine == "native":
+        with _open_fasta_source(fasta_file, buffer) as handle:
+            return _fasta_tuples_2_dict(_iter_fasta_handle(handle))
+    from Bio import SeqIO
+    with _open_fasta_source(fasta_file, buffer, text=True) as handle:
+        return {seq_name: str(record.seq) for seq_name, record in SeqIO.to_dict(SeqIO.parse(handle, "fasta")).items()}
+
+
+def _fasta_lengths_file(fasta_file, buffer=None):
+    """Return :func:`fasta_lengths` of `fasta_file`, or scan its prefetched `buffer`"""
+    from array import array
+
+    if buffer is None:
+        return fasta_lengths(fasta_file)
+    if isinstance(buffer, BaseException):
+        raise buffer
+    ids = []
+    lengths = array("Q")
+    for seq_id, length in _scan_fasta_lengths(buffer):
+        ids.append(seq_id)
+        lengths.append(length)
+    return ids, lengths
+
+
+def _prefetch_size(fasta_file):
+    """Return an estimate of the size of `fasta_file` once read in memory (decompressed)"""
+    from pathlib import Path
+    try:
+        size = Path(fasta_file).stat().st_size
+    except OSError:
+        return 0
+    # usual compression ratio of fasta
+    return size * 4 if str(fasta_file).endswith((".gz", ".bgz")) else size
+
+
+def _map_files(function, fasta_files_list, workers, prefetch, *args):
+    """
+    Ordered map of `function(fasta_file, *args)` like :func:`_map_workers`. On a single worker, the upcoming
+    files are read by a :class:`PrefetchReader` of depth `prefetch` and given as `buffer` keyword to `function`
+    (read errors are given as `buffer` too, so `function` raise them on its file). Files larger than
+    `_PREFETCH_MAX_FILE_SIZE` (decompressed) are not prefetched but streamed by `function`, so memory stay bounded
+    by `prefetch` small files.
+    """
+    if not isinstance(prefetch, int) or isinstance(prefetch, bool) or prefetch < 0:
+        raise ValueError(f'ERROR: prefetch "{prefetch}" must be a positive integer or 0')
+    fasta_files_list = list(fasta_files_list)
+    if workers == 1 and prefetch and len(fasta_files_list) > 1:
+        small_files = {fasta_file for fasta_file in fasta_files_list
+                       if _prefetch_size(fasta_file) <= _PREFETCH_MAX_FILE_SIZE}
+        with PrefetchReader([fasta_file for fasta_file in fasta_files_list if fasta_file in small_files],
+                            depth=prefetch, return_exceptions=True) as reader:
+            prefetched = iter(reader)
+            for fasta_file in fasta_files_list:
+                if fasta_file in small_files:
+                    yield function(fasta_file, *args, buffer=next(prefetched)[1])
+                else:
+                    yield function(fasta_file, *args)
+        return
+    yield from _map_workers(function, fasta_files_list, workers, *args)
+
+
+def _parse_region(region, names=()):
+    """Split a samtools-like region "name:start-end" into (name, start, end), positions are None if absent"""
+    if region in names:
+        return region, None, None
+    name, sep, positions = region.rpartition(":")
+    if not sep:
+        return region, None, None
+    positions = positions.replace(",", "")
+    start, _, end = positions.partition("-")
+    try:
+        return name, int(start) if start else None, int(end) if end else None
+    except ValueError:
+        raise ValueError(f'ERROR: region "{region}" is not a valid region, must be "name:start-end"')
+
+
+def _parse_gff_attributes(attribute_string):
+    """Parse the GFF3 attribute column into a dict, keys and values are percent-decoded only if they contain "%" """
+    if attribute_string == "." or not attribute_string:
+        return {}
+    attributes = {}
+    for attribute in attribute_string.split(";"):
+        if attribute:
+            key, _, value = attribute.partition("=")
+            attributes[key] = value
+    if "%" in attribute_string:
+        from urllib.parse import unquote
+        attributes = {unquote(key): unquote(value) for key, value in attributes.items()}
+    return attributes
+
+
+def _extract_gff_attributes(attribute_string, keys):
+    """Return the dict of the `keys` found on the GFF3 attribute column, without splitting the other attributes"""
+    attributes = {}
+    for key in keys:
+        pattern = f"{key}="
+        start = attribute_string.find(pattern)
+        while start > 0 and attribute_string[start - 1] != ";":
+            start = attribute_string.find(pattern, start + 1)
+        if start == -1:
+            continue
+        start += len(pattern)
+        end = attribute_string.find(";", start)
+        value = attribute_string[start:] if end == -1 else attribute_string[start:end]
+        if "%" in value:
+            from urllib.parse import unquote
+            value = unquote(value)
+        attributes[key] = value
+    return attributes
+
+
+def _gff_id_parent(attribute_string):
+    """Return the (ID, Parent) values of the GFF3 attribute column, None if absent"""
+    feature_id = parent = None
+    for attribute in attribute_string.split(";"):
+        if attribute[:3] == "ID=":
+            feature_id = attribute[3:]
+        elif attribute[:7] == "Parent=":
+            parent = attribute[7:]
+    if "%" in attribute_string:
+        from urllib.parse import unquote
+        feature_id = None if feature_id is None else unquote(feature_id)
+        parent = None if parent is None else ",".join(unquote(value) for value in parent.split(","))
+    return feature_id, parent
+
+
+def _build_nclist(starts, ends):
+    """
+    Build a nested containment list of the intervals `starts`-`ends` (Alekseyenko and Lee, 2007), flattened on
+    lists: (starts, ends, indexes, children, offsets). Sublist number k hold the positions offsets[k] to
+    offsets[k + 1], the first one the intervals contained by no other, and each interval point to the sublist of
+    the intervals it contains directly (children, -1 if none). Intervals of a sublist are not nested, so their
+    starts and ends are both sorted and one binary search find the first one overlapping a query.
+    """
+    import numpy as np
+
+    starts = np.asarray(starts, dtype=np.int64)
+    ends = np.asarray(ends, dtype=np.int64)
+    order = np.lexsort((-ends, starts)).tolist()
+    end_list = ends.tolist()
+    parents = [-1] * len(order)
+    stack = []
+    for index in order:
+        while stack and end_list[stack[-1]] < end_list[index]:
+            stack.pop()
+        if stack:
+            parents[index] = stack[-1]
+        stack.append(index)
+
+    # group the intervals by parent (the top sublist first), in sort order inside a sublist
+    ranks = np.empty(len(order), dtype=np.int64)
+    ranks[order] = np.arange(len(order))
+    keys = np.array(parents, dtype=np.int64) + 1
+    flat = np.lexsort((ranks, keys))
+    sublist_keys, offsets = np.unique(keys[flat], return_index=True)
+    sublist_numbers = np.full(len(order) + 1, -1, dtype=np.int64)
+    sublist_numbers[sublist_keys] = np.arange(len(sublist_keys))
+    return (starts[flat].tolist(), ends[flat].tolist(), flat.tolist(), sublist_numbers[flat + 1].tolist(),
+            offsets.tolist() + [len(order)])
+
+
+def _gff_filters(types=None, seqids=None, region=None, attributes=None):
+    """
+    Normalize the :meth:`ParseGFF.parseGFF3` filters to a (types, seqids, region, attributes) tuple of sets,
+    (seqid, start, end) and dict, or None without filter. A single str is accepted for `types` and `seqids`.
+    """
+    if types is None and seqids is None and region is None and attributes is None:
+        return None
+    if isinstance(types, str):
+        types = [types]
+    if isinstance(seqids, str):
+        seqids = [seqids]
+    types = None if types is None else frozenset(types)
+    seqids = None if seqids is None else frozenset(seqids)
+    if region is not None:
+        region = _parse_region(region) if isinstance(region, str) else tuple(region)
+        seqids = frozenset([region[0]]) if seqids is None else seqids & {region[0]}
+    if attributes is not None:
+        attributes = {key: value if value is None or isinstance(value, str) else frozenset(value)
+                      for key, value in dict(attributes).items()}
+    return types, seqids, region, attributes
+
+
+def _gff_attributes_selected(values, attributes):
+    """Return True if the `values` dict of the attribute column match the `attributes` filter"""
+    for key, value in attributes.items():
+        if key not in values:
+            return False
+        if value is not None and (values[key] != value if isinstance(value, str) else values[key] not in value):
+            return False
+    return True
+
+
+def _gff_line_filter(filters):
+    """
+    Return a function telling if a raw GFF3 feature line pass the normalized `filters` of :func:`_gff_filters`.
+    Only the needed columns are split and a value is percent-decoded only if it contain "%", malformed lines
+    pass so the parser raise on them.
+    """
+    from urllib.parse import unquote
+
+    types, seqids, region, attributes = filters
+    maxsplit = 8 if attributes is not None else 5 if region is not None else 3
+
+    def keep(line):
+        parts = line.split("\t", maxsplit)
+        if len(parts) <= maxsplit:
+            return True
+        if seqids is not None:
+            seqid = parts[0].strip()
+            if (unquote(seqid) if "%" in seqid else seqid) not in seqids:
+                return False
+        if types is not None:
+            feature_type = parts[2]
+            if (unquote(feature_type) if "%" in feature_type else feature_type) not in types:
+                return False
+        if region is not None:
+            if parts[3] == "." or parts[4] == ".":
+                return False
+            if (region[2] is not None and int(parts[3]) > region[2]) or \
+                    (region[1] is not None and int(parts[4]) < region[1]):
+                return False
+        if attributes is not None:
+            return _gff_attributes_selected(_extract_gff_attributes(parts[8].strip(), attributes), attributes)
+        return True
+
+    return keep
+
+
+def _gff_prefilter(lines, filters, first_line=1, batch_size=65536):
+    """
+    Yield (line number, line) of the newline terminated `lines` which can pass the `seqids` and `types` of the
+    normalized `filters`, plus the "##FASTA" line and the lines with a "%" in their seqid or type (checked after
+    decoding). Lines are scanned by chunks with one regular expression, so rejected lines never reach
+    Python code.
+    """
+    from itertools import islice
+    import re
+
+    types, seqids = filters[0], filters[1]
+    # seqids and types are compared decoded, so encoded values ("%") are let through to be checked after decoding
+    seqid_pattern = "[^\t\n]*" if seqids is None else "|".join([re.escape(seqid) for seqid in seqids] +
+                                                                 ["[^\t\n%]*%[^\t\n]*"])
+    type_pattern = "[^\t\n]*" if types is None else "|".join([re.escape(feature_type) for feature_type in types] +
+                                                               ["[^\t\n%]*%[^\t\n]*"])
+    # lines are matched from their preceding newline: the literal prefix lets the regex engine jump from line to line
+    pattern = re.compile(f"\n(?:(?:{seqid_pattern})\t[^\t\n]*\t(?:{type_pattern})\t|##FASTA)")
+
+    if hasattr(lines, "readline"):
+        # file like objects are read by chunks of whole lines, cheaper than joining them one by one
+        chunks = iter(lambda: lines.read(batch_size * 64) + lines.readline(), "")
+    else:
+        lines = iter(lines)
+        chunks = iter(lambda: "".join(islice(lines, batch_size)), "")
+    line_number = first_line
+    for chunk in chunks:
+        text = "\n" + chunk
+        position = 0
+        batch_line_number = line_number - 1
+        for match in pattern.finditer(text):
+            start = match.start()
+            batch_line_number += text.count("\n", position, start + 1)
+            position = start + 1
+            end = text.find("\n", position)
+            yield batch_line_number, text[position:] if end == -1 else text[position:end]
+        line_number = batch_line_number + text.count("\n", position)
+
+
+def _gff_record_selected(record, filters):
+    """Return True if a :class:`GFFRecord` pass the normalized `filters` of :func:`_gff_filters`"""
+    types, seqids, region, attributes = filters
+    if seqids is not None and record.seqid not in seqids:
+        return False
+    if types is not None and record.type not in types:
+        return False
+    if region is not None and (record.start is None or record.end is None or
+                               (region[2] is not None and record.start > region[2]) or
+                               (region[1] is not None and record.end < region[1])):
+        return False
+    if attributes is not None:
+        if record._raw is not None:
+            return _gff_attributes_selected(_extract_gff_attributes(record._raw, attributes), attributes)
+        return _gff_attributes_selected(record.attributes, attributes)
+    return True
+
+
+def _iter_gff3_records(lines, filename="<gff>", attribute_keys=None, first_line=1, filters=None):
+    """
+    Yield a :class:`GFFRecord` for each feature line of GFF3 text `lines`, stop on the "##FASTA" section.
+    Fields are built positionally, percent-decoding is done only on values containing "%" and seqid, source and
+    type are interned so records of a file share them. The attribute column is kept raw and decoded on first
+    access, or only `attribute_keys` are extracted. Lines are numbered from `first_line` on error messages.
+    Lines not passing the :func:`_gff_filters` `filters` are skipped on their raw columns, before any decoding
+    (and before checking their number of columns).
+    """
+    from sys import intern
+    from urllib.parse import unquote
+
+    keep = None if filters is None else _gff_line_filter(filters)
+    if filters is not None and (filters[0] is not None or filters[1] is not None):
+        numbered_lines = _gff_prefilter(lines, filters, first_line)
+    else:
+        numbered_lines = enumerate(lines, first_line)
+    for line_number, line in numbered_lines:
+        if line.startswith("#"):
+            if line.startswith("##FASTA"):
+                break
+            continue
+        if keep is not None and not keep(line):
+            continue
+        line = line.strip()
+        if not line:
+            continue
+        parts = line.split("\t")
+        if len(parts) != 9:
+            raise ValueError(f'ERROR: line {line_number} of "{filename}" has {len(parts)} columns, GFF3 must have 9')
+        seqid, source, feature_type, start, end, score, strand, phase, attributes = parts
+        start = None if start == "." else int(start)
+        end = None if end == "." else int(end)
+        record = GFFRecord(
+                None if seqid == "." else intern(unquote(seqid) if "%" in seqid else seqid),
+                None if source == "." else intern(unquote(source) if "%" in source else source),
+                None if feature_type == "." else intern(unquote(feature_type) if "%" in feature_type else feature_type),
+                start,
+                end,
+                None if score == "." else float(score),
+                None if strand == "." else unquote(strand) if "%" in strand else strand,
+                None if phase == "." else unquote(phase) if "%" in phase else phase,
+                attributes,
+                None,
+                None if start is None or end is None else end - start)
+        if attribute_keys is not None:
+            record._attributes = _extract_gff_attributes(attributes, attribute_keys)
+        yield record
+
+
+def _parse_gff3_lines(lines, filename="<gff>", attribute_keys=None, filters=None, first_line=1):
+    """
+    Worker of parallel :meth:`ParseGFF.parseGFF3`: parse a batch of GFF3 lines. Return the rows of the records
+    (plain tuples are much faster to send back than objects) and the dicts of `attribute_keys` if set.
+    """
+    records = list(_iter_gff3_records(lines, filename, attribute_keys, first_line, filters))
+    rows = [record._row() for record in records]
+    return rows, None if attribute_keys is None else [record._attributes for record in records]
+
+
+def _gff3_rows_2_records(rows, attributes=None):
+    """Yield the :class:`GFFRecord` of rows returned by :func:`_parse_gff3_lines`"""
+    if attributes is None:
+        for row in rows:
+            yield GFFRecord(*row)
+        return
+    for row, record_attributes in zip(rows, attributes):
+        record = GFFRecord(*row)
+        record._attributes = record_attributes
+        yield record
+
+
+def _parse_gff3_range(start, end, filename, function, *args, first_line=1):
+    """
+    Worker of parallel GFF3 parsing: apply `function(lines, filename, *args, first_line=...)` on the lines between
+    bytes `start` and `end` of `filename`. Return its result, the number of lines and True if the range contain the
+    "##FASTA" section.
+    """
+    import io
+
+    with open(filename, "rb") as handle:
+        handle.seek(start)
+        data = handle.read(end - start)
+    fasta = data.startswith(b"##FASTA") or b"\n##FASTA" in data
+    result = function(io.StringIO(data.decode()), filename, *args, first_line=first_line)
+    return result, data.count(b"\n"), fasta
+
+
+def _gff3_byte_ranges(filename, nb_ranges):
+    """Return `nb_ranges` (or less) (start, end) byte ranges covering `filename`, cut at line ends"""
+    import os
+
+    size = os.path.getsize(filename)
+    boundaries = [0]
+    with open(filename, "rb") as handle:
+        for index in range(1, nb_ranges):
+            position = size * index // nb_ranges
+            if position <= boundaries[-1]:
+                continue
+            handle.seek(position - 1)
+            handle.readline()
+            if handle.tell() >= size:
+                break
+            if handle.tell() > boundaries[-1]:
+                boundaries.append(handle.tell())
+    boundaries.append(size)
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def _submit_ordered(executor, function, items, depth, *args):
+    """
+    Yield (item, future) of `function(*item, *args)` submitted to `executor` in the order of `items`, `items` are
+    consumed lazily so at most `depth` futures are pending. Pending futures are cancelled if the caller stop.
+    """
+    from collections import deque
+
+    items = iter(items)
+    pending = deque()
+    try:
+        for item in items:
+            pending.append((item, executor.submit(function, *item, *args)))
+            if len(pending) == depth:
+                break
+        while pending:
+            item, future = pending.popleft()
+            for next_item in items:
+                pending.append((next_item, executor.submit(function, *next_item, *args)))
+                break
+            yield item, future
+    finally:
+        for _, future in pending:
+            future.cancel()
+
+
+def _iter_gff3_chunks(filename, workers, function, *args, batch_size=100000):
+    """
+    Yield in file order the results of `function(lines, filename, *args, first_line=...)` on chunks of GFF3
+    `filename` parsed on `workers` processes: byte ranges cut at line ends for plain files, batches of
+    `batch_size` lines read by a single reader for gzip files.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from itertools import islice
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        first_line = 1
+        with open(filename, "rb") as handle:
+            gzip_file = handle.read(2) == b"\x1f\x8b"
+        if not gzip_file:
+            ranges = _gff3_byte_ranges(filename, workers * 4)
+            for (start, end), future in _submit_ordered(executor, _parse_gff3_range, ranges, workers * 2, filename,
+                                                        function, *args):
+                try:
+                    result, nb_lines, fasta = future.result()
+                except ValueError:
+                    # parse the range again with its line numbers to raise the error with the file line
+                    _parse_gff3_range(start, end, filename, function, *args, first_line=first_line)
+                    raise
+                yield result
+                if fasta:
+                    return
+                first_line += nb_lines
+            return
+
+        with _open_fasta(filename, text=True) as in_file:
+            def batches():
+                while True:
+                    batch = list(islice(in_file, batch_size))
+                    fasta = next((index for index, line in enumerate(batch) if line.startswith("##FASTA")), None)
+                    if fasta is not None:
+                        batch = batch[:fasta]
+                    if batch:
+                        yield (batch,)
+                    if fasta is not None or len(batch) < batch_size:
+                        return
+
+            for (batch,), future in _submit_ordered(executor, function, batches(), workers * 2, filename, *args):
+                try:
+                    result = future.result()
+                except ValueError:
+                    function(batch, filename, *args, first_line=first_line)
+                    raise
+                yield result
+                first_line += len(batch)
+
+
+def _parse_gff3_columns(lines, filename="<gff>", first_line=1):
+    """
+    Parse GFF3 text `lines` into columns for :class:`GFFColumns`, stop on the "##FASTA" section.
+    Return the dict of NumPy columns, the dict of category names of seqid, source and type (codes are their
+    indexes) and the list of raw attribute columns.
+    """
+    from array import array
+    from urllib.parse import unquote
+    import numpy as np
+
+    categories = {"seqid": {}, "source": {}, "type": {}}
+    seqids, sources, types = categories["seqid"], categories["source"], categories["type"]
+    seqid_codes, source_codes, type_codes = array("i"), array("i"), array("i")
+    starts, ends, scores = array("q"), array("q"), array("f")
+    strands, phases = array("b"), array("b")
+    attributes_list = []
+    nan = float("nan")
+    for line_number, line in enumerate(lines, first_line):
+        if line.startswith("#"):
+            if line.startswith("##FASTA"):
+                break
+            continue
+        line = line.strip()
+        if not line:
+            continue
+        parts = line.split("\t")
+        if len(parts) != 9:
+            raise ValueError(f'ERROR: line {line_number} of "{filename}" has {len(parts)} columns, GFF3 must have 9')
+        seqid, source, feature_type, start, end, score, strand, phase, attributes = parts
+        if "%" in seqid:
+            seqid = unquote(seqid)
+        if "%" in source:
+            source = unquote(source)
+        if "%" in feature_type:
+            feature_type = unquote(feature_type)
+        seqid_codes.append(-1 if seqid == "." else seqids.setdefault(seqid, len(seqids)))
+        source_codes.append(-1 if source == "." else sources.setdefault(source, len(sources)))
+        type_codes.append(-1 if feature_type == "." else types.setdefault(feature_type, len(types)))
+        starts.append(-1 if start == "." else int(start))
+        ends.append(-1 if end == "." else int(end))
+        scores.append(nan if score == "." else float(score))
+        strands.append(_GFF_STRANDS.get(strand, 0))
+        phases.append(-1 if phase == "." else int(phase))
+        attributes_list.append(attributes)
+
+    columns = {
+            "seqid" : np.frombuffer(seqid_codes, dtype=np.int32),
+            "source": np.frombuffer(source_codes, dtype=np.int32),
+            "type"  : np.frombuffer(type_codes, dtype=np.int32),
+            "start" : np.frombuffer(starts, dtype=np.int64),
+            "end"   : np.frombuffer(ends, dtype=np.int64),
+            "score" : np.frombuffer(scores, dtype=np.float32),
+            "strand": np.frombuffer(strands, dtype=np.int8),
+            "phase" : np.frombuffer(phases, dtype=np.int8),
+    }
+    return columns, {field: list(names) for field, names in categories.items()}, attributes_list
+
+
+def _concat_gff3_columns(chunks):
+    """Concatenate the :func:`_parse_gff3_columns` results of consecutive chunks, merging their category codes"""
+    import numpy as np
+
+    chunks = list(chunks)
+    if not chunks:
+        return _parse_gff3_columns([])
+    if len(chunks) == 1:
+        return chunks[0]
+    columns = {}
+    categories = {}
+    for field in GFFColumns._categorical:
+        names = {}
+        codes = []
+        for chunk_columns, chunk_categories, _ in chunks:
+            # local code -> global code, the last item keep the missing value -1
+            remap = np.array([names.setdefault(name, len(names)) for name in chunk_categories[field]] + [-1],
+                             dtype=np.int32)
+            codes.append(remap[chunk_columns[field]])
+        columns[field] = np.concatenate(codes) if codes else np.empty(0, dtype=np.int32)
+        categories[field] = list(names)
+    for field in ("start", "end", "score", "strand", "phase"):
+        columns[field] = np.concatenate([chunk_columns[field] for chunk_columns, _, _ in chunks])
+    attributes_list = [attributes for _, _, chunk_attributes in chunks for attributes in chunk_attributes]
+    return columns, categories, attributes_list
+
+
+##################################################
+# Functions
+
+def assembly_stats(path, workers=1, prefetch=0):
+    """
+    Function that take a fasta file or a directory of fasta files (assemblies), and return a dict of statistics by
+    file ready for :func:`yoda_powers.display.dict_dict_2_txt`.
+
+    Lengths and base composition are computed with NumPy, files of a directory are processed on `workers`
+    processes.
+
+    ==========  ===========================================================
+    key         infos
+    ==========  ===========================================================
+    NUM         number of sequences
+    MIN         length of the shortest sequence
+    MAX         length of the longest sequence
+    N50 BP      N50: length of the sequence where 50% of the total length is reach
+    N50 NUM     L50: number of sequences to reach 50% of the total length
+    N90 BP      N90: length of the sequence where 90% of the total length is reach
+    N90 NUM     L90: number of sequences to reach 90% of the total length
+    TOTAL       total length
+    MEAN        mean length
+    GC %        percent of G and C on A, C, G and T (case insensitive)
+    N %         percent of N on the total length
+    A C G T N   number of each base (case insensitive)
+    OTHER       number of other characters (IUPAC codes, gaps, ...)
+    ==========  ===========================================================
+
+    Notes:
+        function need modules:
+
+        - pathlib
+        - numpy
+        - concurrent.futures
+
+    Arguments:
+        path (str): a path to a fasta file or to a directory of fasta files ( file with extention "fa", "fasta",
+                    "fas", can be gzip compressed )
+        workers (int, optional): number of processes used for a directory. Default=1
+        prefetch (int, optional): number of files read ahead by :class:`PrefetchReader` threads while the current
+                                  one is processed (single process only), 0 to disable. Default=0
+
+    Returns:
+        :class:`dict`: dict of dict with file name without extension in key and statistics in values
+
+    Raises:
+         ValueError: If `path` does not exist.
+         ValueError: If two files have the same name once their extension removed (ex: "a.fa" and "a.fasta").
+         ValueError: If `workers` is not a positive integer.
+         ValueError: If `prefetch` is not a positive integer or 0.
+
+    Example:
+        >>> stats = assembly_stats("path/to/assemblies/", workers=8)
+        >>> print(dict_dict_2_txt(stats, "souches"))
+        souches	NUM	MIN	MAX	N50 BP	N50 NUM	N90 BP	N90 NUM	TOTAL	MEAN	GC %	N %	A	C	G	T	N	OTHER
+        Souche1	171	2042	3133578	938544	11	160211	35	38450021	224853.9	51.83	0.02	...
+        Souche2	182	5004	74254	45245	293	14573	893	39235110	215577.53	51.72	0.0	...
+    """
+    from pathlib import Path
+
+    _check_workers(workers)
+    path = Path(path).resolve()
+    if not path.exists():
+        raise ValueError(f'ERROR: "{path}" does not exist')
+    if path.is_dir():
+        fasta_files_list = _fasta_files_in(path)
+    else:
+        fasta_files_list = [path]
+
+    names = {}
+    for fasta_file in fasta_files_list:
+        name = _fasta_file_stem(fasta_file.name) or fasta_file.name
+        if name in names:
+            raise ValueError(f'ERROR: "{names[name].name}" and "{fasta_file.name}" have the same name "{name}"')
+        names[name] = fasta_file
+    return dict(zip(names, _map_files(_assembly_stats_file, fasta_files_list, workers, prefetch)))
+
+
+def concat_fasta_files(path_directory, engine="biopython", workers=1, gap="-", output=None, out_format="fasta",
+                       prefetch=4):
+    """
+    Return a fasta dictionnary of concatenation fasta file's find in directory ("fasta", "fa", "fas", can be gzip
+    or BGZF compressed)
+
+    Files are parsed in a pool of `workers` processes, the pieces of each taxon are collected and joined once
+    at the end. Taxa missing on a file, or sequences shorter than the longest one of their file, are filled with
+    `gap` so the concatenation stay aligned.
+
+    With `output`, the matrix is never hold in memory: a first pass read the taxa names and the length of each
+    file, the output file is pre-sized with one slot by taxon, then a second pass read the files one by one
+    and write each sequence on its slot. Memory only depend on the largest input file.
 
     Warning:
         Sequence on fasta must have the same name
@@ -9,58 +1372,90 @@ def concat_fasta_files(path_directory):
         function need modules:
 
         - pathlib
+        - concurrent.futures
         - BioPython
 
     Arguments:
         path_directory (str): a path to fasta file directory
+        engine (str, optional): "biopython" (default) or "native" to read files with :func:`iter_fasta`
+        workers (int, optional): number of processes used to parse the files. Default=1
+        prefetch (int, optional): number of files read ahead by :class:`PrefetchReader` threads while the current
+                                  one is parsed (single process only), 0 to disable. Default=4
+        gap (str, optional): the character used to fill missing taxa. Default="-"
+        output (str, optional): a path to write the concatenation instead of returning a dict
+        out_format (str, optional): the `output` format, "fasta" (one line by sequence) or "phylip" (relaxed
+                                    sequential). Default="fasta"
 
     Returns:
-        :class:`dict`: python dict with the concatenation of fasta filename in path_directory ( file with extention "fa", "fasta", "fas" )
+        :class:`dict`: python dict with the concatenation of fasta filename in path_directory ( file with extention "fa", "fasta", "fas" ),
+        values are ``Seq`` with "biopython" engine and ``str`` with "native" engine
+
+        :class:`str`: with `output`, the output file name
 
     Raises:
          ValueError: If `path_directory` does not exist.
          ValueError: If `path_directory` is not a valid directory.
+         ValueError: If `engine` is not "biopython" or "native".
+         ValueError: If `workers` is not a positive integer.
+         ValueError: If `prefetch` is not a positive integer or 0.
+         ValueError: If `gap` is not a single ASCII character.
+         ValueError: If `out_format` is not "fasta" or "phylip".
 
     Examples:
-        >>> dico_concat = concat_fasta_files('path/to/directory/')
+        >>> dico_concat = concat_fasta_files('path/to/directory/', engine="native", workers=8)
         >>> print(dico_concat)
             {"Seq1":"ATGCTGCAGTAG","Seq2":"ATGCCGATCGATG","Seq3":"ATGCTCAGTCAGTAG"}
+        >>> concat_fasta_files('path/to/directory/', output="supermatrix.phy", out_format="phylip")
+            '/path/to/supermatrix.phy'
     """
     from pathlib import Path
-    from Bio import SeqIO
 
+    _check_engine(engine)
+    _check_workers(workers)
+    if not isinstance(gap, str) or len(gap) != 1 or not gap.isascii():
+        raise ValueError(f'ERROR: gap "{gap}" must be a single ASCII character')
     if not Path(path_directory).exists():
         raise ValueError(f'ERROR: directory "{path_directory}" does not exist')
     elif not Path(path_directory).is_dir():
         raise ValueError(f'ERROR: "{path_directory} " is not a valid directory')
 
     path_directory = Path(path_directory).resolve()
-    fa_files = path_directory.glob("*.fa")
-    fasta_files = path_directory.glob("*.fasta")
-    fas_files = path_directory.glob("*.fas")
-
-    output_dico_seqs = {}
-
-    for fasta_file in (*fa_files, *fasta_files, *fas_files):
-        # print(fasta_file)
-        with open(fasta_file.as_posix(), "rU") as handle:
-            record_dict = SeqIO.to_dict(SeqIO.parse(handle, "fasta"))
+    fasta_files_list = _fasta_files_in(path_directory)
+
+    if output is not None:
+        if out_format not in ("fasta", "phylip"):
+            raise ValueError(f'ERROR: out_format "{out_format}" must be "fasta" or "phylip"')
+        return _concat_fasta_files_2_file(fasta_files_list, output, out_format, engine, workers, gap, prefetch)
+
+    taxa_pieces = {}
+    concat_length = 0
+    for record_dict in _map_files(_read_fasta_file, fasta_files_list, workers, prefetch, engine):
+        gene_length = max(map(len, record_dict.values()), default=0)
+        gene_gap = gap * gene_length
         for seq_name in sorted(record_dict.keys()):
-            if seq_name not in output_dico_seqs.keys():
-                name = record_dict[seq_name].id
-                seq = record_dict[seq_name].seq
-                output_dico_seqs[name] = seq
-            else:
-                name = record_dict[seq_name].id
-                seq = record_dict[seq_name].seq
-                output_dico_seqs[name] += seq
-
+            if seq_name not in taxa_pieces:
+                taxa_pieces[seq_name] = [gap * concat_length]
+            taxa_pieces[seq_name].append(record_dict[seq_name].ljust(gene_length, gap))
+        for seq_name, pieces in taxa_pieces.items():
+            if seq_name not in record_dict:
+                pieces.append(gene_gap)
+        concat_length += gene_length
+
+    output_dico_seqs = {seq_name: "".join(pieces) for seq_name, pieces in taxa_pieces.items()}
+    if engine == "biopython":
+        from Bio.Seq import Seq
+        output_dico_seqs = {seq_name: Seq(seq) for seq_name, seq in output_dico_seqs.items()}
     return output_dico_seqs
 
 
-def convert_fasta_2_nexus(path_directory, path_directory_out):
+def convert_fasta_2_nexus(path_directory, path_directory_out, workers=None, prefetch=4):
     """
-    Return the number of fasta file's convert  find in directory ("fasta", "fa", "fas") where are converted
+    Return the number of fasta file's convert  find in directory ("fasta", "fa", "fas", can be gzip or BGZF
+    compressed) where are converted, each one to ``<name without extensions>.nex``
+
+    With `workers`, run in batch mode: files are converted in a pool of `workers` processes, files with a
+    ``.nex`` output newer than the fasta are skipped and errors are reported on the returned summary instead
+    of stopping the conversion.
 
     Warning:
         Sequence on fasta must align and have the same length
@@ -69,108 +1464,334 @@ def convert_fasta_2_nexus(path_directory, path_directory_out):
         function need modules:
 
         - pathlib
-        - BioPython
+        - concurrent.futures
 
     Arguments:
         path_directory (str): a path to fasta file directory
         path_directory_out (str): a directory path to write nexus file
+        workers (int, optional): number of processes for batch mode. Default=None (no batch mode)
+        prefetch (int, optional): number of files read ahead by :class:`PrefetchReader` threads while the current
+                                  one is converted (without batch processes), 0 to disable. Default=4
 
     Returns:
         :class:`int`: the number of file converted
 
+        :class:`dict`: in batch mode, the status of each fasta file: "converted", "up-to-date" or the error message
+
     Raises:
          ValueError: If `path_directory` does not exist.
          ValueError: If `path_directory` is not a valid directory.
-         ValueError: If fasta is not align.
+         ValueError: If fasta is not align (not in batch mode).
+         ValueError: If two IDs of a fasta are the same once "-" replaced by "_" (not in batch mode).
+         ValueError: If `workers` is not a positive integer.
+         ValueError: If `prefetch` is not a positive integer or 0.
 
     Examples:
         >>> nb_file = convert_fasta_2_nexus('path/to/directory/',' path/to/directory/')
         >>> print(nb_file)
             "4172"
+        >>> summary = convert_fasta_2_nexus('path/to/directory/',' path/to/directory/', workers=8)
+        >>> print(summary)
+            {'/path/to/directory/gene1.fasta': 'converted', '/path/to/directory/gene2.fasta': 'up-to-date',
+            '/path/to/directory/gene3.fasta': 'ERROR: ...'}
     """
     from pathlib import Path
-    from Bio import AlignIO
-    from Bio.Nexus import Nexus
 
     if not Path(path_directory).exists():
         raise ValueError(f'ERROR: directory "{path_directory}" does not exist')
     elif not Path(path_directory).is_dir():
         raise ValueError(f'ERROR: "{path_directory} " is not a valid directory')
+    if workers is not None:
+        _check_workers(workers)
 
     path_directory = Path(path_directory).resolve()
     path_directory_out = Path(path_directory_out).resolve()
     if not path_directory_out.exists():
         path_directory_out.mkdir()
 
-    fa_files = path_directory.glob("*.fa")
-    fasta_files = path_directory.glob("*.fasta")
-    fas_files = path_directory.glob("*.fas")
+    fasta_files_list = _fasta_files_in(path_directory)
 
-    # general variables:
-    minimal_record = f'#NEXUS\nbegin data; dimensions ntax=0 nchar=0; format datatype=dna; end;'
-    count_convert = 0
+    if workers is not None:
+        summary = {}
+        to_convert = []
+        for fasta_file in fasta_files_list:
+            nexus_file = path_directory_out.joinpath(f"{_fasta_file_stem(fasta_file.name)}.nex")
+            if nexus_file.exists() and nexus_file.stat().st_mtime >= fasta_file.stat().st_mtime:
+                summary[fasta_file.as_posix()] = "up-to-date"
+            else:
+                summary[fasta_file.as_posix()] = None
+                to_convert.append(fasta_file)
+        for fasta_file, status in zip(to_convert, _map_files(_convert_fasta_2_nexus_batch, to_convert, workers,
+                                                              prefetch, path_directory_out)):
+            summary[fasta_file.as_posix()] = status
+        return summary
 
-    for fasta_file in (*fa_files, *fasta_files, *fas_files):
-        try:
-            count_convert += 1
-            print(Path(fasta_file))
-            basename = Path(fasta_file).stem
-            alignment = AlignIO.read(fasta_file.as_posix(), format='fasta')
-            n = Nexus.Nexus(minimal_record)
-            n.alphabet = alignment._alphabet
-            for record in alignment:
-                n.add_sequence(record.id.replace("-", "_"), str(record.seq))
-            n.write_nexus_data(f"{path_directory_out.as_posix()}/{basename}.nex", interleave=False)
-        except ValueError as e:
-            raise ValueError(f"ERROR on file {fasta_file}, with message: {e}, please check")
+    count_convert = 0
+    with PrefetchReader(fasta_files_list, depth=prefetch, return_exceptions=True) as reader:
+        for fasta_file, buffer in reader:
+            try:
+                count_convert += 1
+                print(Path(fasta_file))
+                _convert_fasta_2_nexus_file(fasta_file, path_directory_out, buffer)
+            except ValueError as e:
+                raise ValueError(f"ERROR on file {fasta_file}, with message: {e}, please check")
 
     return count_convert
 
 
-def dict_2_fasta(dico, fasta_out):
+def dedup_fasta(fasta_files, fasta_out, mapping_out=None, ignore_case=False, revcomp=False, wrap=60):
+    """
+    Function that remove identical sequences from one or many fasta files, keeping the first record of each.
+
+    Each sequence is hashed with a 128-bit BLAKE2b digest and only digests are kept in memory, so memory grows
+    with the number of unique sequences, not with their size. Unique records are written as they are read.
+
+    Notes:
+        function need modules:
+
+        - hashlib
+        - pathlib
+
+    Arguments:
+        fasta_files (str or list): a path or a list of paths to fasta files, can be gzip or BGZF compressed
+        fasta_out (str): a path to write the unique records (compressed with ".gz" or ".bgz" extension)
+        mapping_out (str, optional): a path to write a TSV mapping each duplicate id to the kept representative id
+        ignore_case (bool, optional): compare sequences case-insensitively. Default=False
+        revcomp (bool, optional): a sequence and its reverse complement are duplicates (nucleotides). Default=False
+        wrap (int, optional): the length of sequence lines, 0 or None to write each sequence on one line. Default=60
+
+    Returns:
+        :class:`tuple`: the number of unique records written and of duplicates removed
+
+    Raises:
+         ValueError: If a fasta file does not exist.
+         ValueError: If a fasta file is not a valid file.
+         ValueError: If `wrap` is not a positive integer, 0 or None.
+
+    Example:
+        >>> dedup_fasta(["sample1.fasta", "sample2.fasta"], "unique.fasta", "duplicates.tsv", revcomp=True)
+        (12045, 3377)
+    """
+    from contextlib import ExitStack
+    from hashlib import blake2b
+    from pathlib import Path
+
+    _check_wrap(wrap)
+    if isinstance(fasta_files, (str, Path)):
+        fasta_files = [fasta_files]
+    fasta_files = [Path(fasta_file).resolve() for fasta_file in fasta_files]
+    for fasta_file in fasta_files:
+        if not fasta_file.exists():
+            raise ValueError(f'ERROR: file "{fasta_file}" does not exist')
+        elif not fasta_file.is_file():
+            raise ValueError(f'ERROR: "{fasta_file} " is not a valid file')
+
+    representatives = {}
+    nb_unique = nb_duplicate = 0
+    with ExitStack() as stack:
+        write_mapping = stack.enter_context(_OutputHandle(mapping_out)) if mapping_out else None
+        if write_mapping:
+            write_mapping("#duplicate_id\trepresentative_id\n")
+        write = stack.enter_context(_OutputHandle(fasta_out))
+        for fasta_file in fasta_files:
+            with _open_fasta(fasta_file) as handle:
+                for seq_id, description, sequence in _iter_fasta_handle(handle):
+                    if ignore_case:
+                        sequence_key = sequence.upper()
+                    else:
+                        sequence_key = sequence
+                    digest = blake2b(sequence_key.encode("latin-1"), digest_size=16).digest()
+                    if revcomp:
+                        digest = min(digest, blake2b(sequence_key.translate(_REVCOMP)[::-1].encode("latin-1"),
+                                                     digest_size=16).digest())
+                    representative = representatives.get(digest)
+                    if representative is None:
+                        representatives[digest] = seq_id
+                        write(_format_fasta_record(description, sequence, wrap))
+                        nb_unique += 1
+                    else:
+                        if write_mapping:
+                            write_mapping(f"{seq_id}\t{representative}\n")
+                        nb_duplicate += 1
+    return nb_unique, nb_duplicate
+
+
+def dict_2_fasta(dico, fasta_out, wrap=60, sort=True, compress=None):
     """
     Function that takes a dictionary where key are ID and value Seq, and write a fasta file.
 
+    Records are formatted as bytes and streamed by large batches to the output, no Biopython object is built.
+
     Notes:
         function need modules:
 
         - pathlib
-        - BioPython
 
     Arguments:
-        dico (dict): python dict with ID in key and Seq on values
-        fasta_out (str): a directory path to write nexus file
+        dico (dict): python dict with ID in key and sequence (``str``, ``bytes``, ``Seq`` or ``SeqRecord``) on values
+        fasta_out (str): a path (or an open handle) to write the fasta file
+        wrap (int, optional): the length of sequence lines, 0 or None to write each sequence on one line. Default=60
+        sort (bool, optional): if True (default) write records sorted by ID, else in the dict order
+        compress (str, optional): "gzip", "bgzf" or False, default guess from `fasta_out` extension
+                                  (".gz" for gzip, ".bgz" for bgzf)
 
     Returns:
         :class:`str`: the output fasta file name
 
+    Raises:
+         ValueError: If `wrap` is not a positive integer, 0 or None.
+         ValueError: If `compress` is not "gzip", "bgzf" or False.
+
     Examples:
         >>> dico = {"Seq1":"ATGCTGCAGTAG","Seq2":"ATGCCGATCGATG","Seq3":"ATGCTCAGTCAGTAG"}
-        >>> dict_2_fasta(dico)
+        >>> dict_2_fasta(dico, "sequences.fasta")
         >Seq1
         ATGCTGCAGTAG
         >Seq2
         ATGCCGATCGATG
         >Seq3
         ATGCTCAGTCAGTAG
+        >>> dict_2_fasta(dico, "sequences.fasta.bgz", wrap=None, sort=False)
     """
-    from pathlib import Path
-    from Bio import SeqIO
-    from Bio.Seq import Seq
-    from Bio.SeqRecord import SeqRecord
+    _check_wrap(wrap)
+    seq_names = sorted(dico.keys()) if sort else dico.keys()
+    with _OutputHandle(fasta_out, binary=True, compress=compress) as write:
+        batch = []
+        batch_size = 0
+        for seq_name in seq_names:
+            seq = _sequence_2_str(dico[seq_name]).encode("latin-1")
+            if wrap and len(seq) > wrap:
+                seq = b"\n".join([seq[i:i + wrap] for i in range(0, len(seq), wrap)])
+            batch.append(b">%s\n%s\n" % (str(seq_name).encode(), seq) if seq else b">%s\n" % str(seq_name).encode())
+            batch_size += len(seq)
+            if batch_size >= _WRITE_BUFFER_SIZE:
+                write(b"".join(batch))
+                batch = []
+                batch_size = 0
+        write(b"".join(batch))
+    return _output_name(fasta_out)
+
+
+def dict_2_nexus(dico, nexus_out, interleave=False, datatype=None, width=60):
+    """
+    Function that takes a dictionary where key are ID and value aligned sequences, and write a nexus file.
+
+    The file is serialized directly from the dict (no Biopython object) with buffered writes, records are
+    written in the dict order.
+
+    Notes:
+        function need modules:
+
+        - pathlib
+
+    Arguments:
+        dico (dict): python dict with ID in key and sequence (``str``, ``bytes`` or ``Seq``) on values
+        nexus_out (str): a path (or an open handle) to write the nexus file
+        interleave (bool, optional): if True write the matrix by blocks of `width` columns. Default=False
+        datatype (str, optional): nexus datatype ("dna", "rna", "protein", ...), guess from sequences if None
+        width (int, optional): number of columns by block on interleave mode. Default=60
+
+    Returns:
+        :class:`str`: the output nexus file name
+
+    Raises:
+         ValueError: If sequences do not have the same length.
+
+    Examples:
+        >>> dico = {"Seq1":"ATGCTGCAGTAG","Seq2":"ATGCCGATC-TG","Seq3":"ATG-TCAGTCAG"}
+        >>> dict_2_nexus(dico, "alignment.nex")
+        #NEXUS
+        begin data;
+        dimensions ntax=3 nchar=12;
+        format datatype=dna missing=? gap=-;
+        matrix
+        Seq1 ATGCTGCAGTAG
+        Seq2 ATGCCGATC-TG
+        Seq3 ATG-TCAGTCAG
+        ;
+        end;
+    """
+    sequences = _alignment_2_str(dico)
+    nchar = len(next(iter(sequences.values()), ""))
+    if datatype is None:
+        datatype = _guess_datatype(sequences.values())
+    names = {seq_name: _nexus_name(seq_name) for seq_name in sequences}
+    name_width = max(map(len, names.values()), default=0)
+
+    with _OutputHandle(nexus_out) as write:
+        write(f"#NEXUS\nbegin data;\ndimensions ntax={len(sequences)} nchar={nchar};\n"
+              f"format datatype={datatype} missing=? gap=-{' interleave' if interleave else ''};\nmatrix\n")
+        if interleave:
+            for block_start in range(0, max(nchar, 1), width):
+                write("".join(f"{names[seq_name].ljust(name_width)} {seq[block_start:block_start + width]}\n"
+                              for seq_name, seq in sequences.items()))
+                write("\n")
+        else:
+            write("".join(f"{names[seq_name].ljust(name_width)} {seq}\n" for seq_name, seq in sequences.items()))
+        write(";\nend;\n")
+    return _output_name(nexus_out)
+
+
+def dict_2_phylip(dico, phylip_out, relaxed=True):
+    """
+    Function that takes a dictionary where key are ID and value aligned sequences, and write a sequential phylip file.
+
+    The file is serialized directly from the dict (no Biopython object) with buffered writes, records are
+    written in the dict order.
+
+    Notes:
+        function need modules:
+
+        - pathlib
+
+    Arguments:
+        dico (dict): python dict with ID in key and sequence (``str``, ``bytes`` or ``Seq``) on values
+        phylip_out (str): a path (or an open handle) to write the phylip file
+        relaxed (bool, optional): if True (default) write full ID followed by a space, else ID are truncated and
+                                  padded to 10 characters (strict phylip)
 
-    with open(Path(fasta_out).resolve().as_posix(), "w") as output_handle:
-        for seq_name in sorted(dico.keys()):
-            seq_obj = Seq(dico[seq_name])
-            record = SeqRecord(seq_obj, id=seq_name, name=seq_name, description="")
-            SeqIO.write(record, output_handle, "fasta")
-    return output_handle.name
+    Returns:
+        :class:`str`: the output phylip file name
 
+    Raises:
+         ValueError: If sequences do not have the same length.
+         ValueError: If an ID contains a space in relaxed mode.
+         ValueError: If ID are not unique once truncated in strict mode.
 
-def extract_seq_from_fasta(fasta_file, wanted_file, include=True):
+    Examples:
+        >>> dico = {"Seq1":"ATGCTGCAGTAG","Seq2":"ATGCCGATC-TG","Seq3":"ATG-TCAGTCAG"}
+        >>> dict_2_phylip(dico, "alignment.phy")
+        3 12
+        Seq1 ATGCTGCAGTAG
+        Seq2 ATGCCGATC-TG
+        Seq3 ATG-TCAGTCAG
+    """
+    sequences = _alignment_2_str(dico)
+    nchar = len(next(iter(sequences.values()), ""))
+    if relaxed:
+        for seq_name in sequences:
+            if any(char.isspace() for char in seq_name):
+                raise ValueError(f'ERROR: ID "{seq_name}" contains space, not allowed on relaxed phylip')
+        name_width = max(map(len, sequences), default=0) + 1
+        names = {seq_name: seq_name.ljust(name_width) for seq_name in sequences}
+    else:
+        names = {seq_name: seq_name[:10].ljust(10) for seq_name in sequences}
+        if len(set(names.values())) != len(names):
+            raise ValueError('ERROR: ID are not unique once truncated to 10 characters, use relaxed phylip')
+
+    with _OutputHandle(phylip_out) as write:
+        write(f"{len(sequences)} {nchar}\n")
+        write("".join(f"{names[seq_name]}{seq}\n" for seq_name, seq in sequences.items()))
+    return _output_name(phylip_out)
+
+
+def extract_seq_from_fasta(fasta_file, wanted_file, include=True, engine="biopython", output=None):
     """
     Function to extract sequence from fasta file
 
+    With `output`, records are streamed: each record is checked against the wanted ids as it is read and
+    written directly, so memory does not depend on the fasta size.
+
     Notes:
         function need modules:
 
@@ -181,14 +1802,21 @@ def extract_seq_from_fasta(fasta_file, wanted_file, include=True):
         fasta_file (str): a path to fasta file directory
         wanted_file (str): a path file with id (one per line)
         include (bool, optional): if True keep id on wanted file, else keep id not in wanted file
+        engine (str, optional): "biopython" (default) or "native" to read `fasta_file` with :func:`iter_fasta`
+        output (str, optional): a path (compressed with gzip if it ends with ".gz") or an open handle to write the
+                                extracted records, `fasta_file` can be gzip compressed, `engine` is not used
 
     Returns:
-        :class:`dict`: the fasta dict with sequence extract
+        :class:`dict`: the fasta dict with sequence extract, values are ``SeqRecord`` with "biopython" engine and
+        ``str`` with "native" engine
+
+        :class:`int`: with `output`, the number of records written
 
     Raises:
          ValueError: If `wanted_file` or `fasta_file` does not exist.
          ValueError: If `wanted_file` or `fasta_file`` is not a valid file.
          ValueError: If `include` is not valid boolean.
+         ValueError: If `engine` is not "biopython" or "native".
 
     Example:
         >>> dict_sequences = extract_seq_from_fasta(fasta_file, wanted_file)
@@ -196,10 +1824,12 @@ def extract_seq_from_fasta(fasta_file, wanted_file, include=True):
         {'Seq2': SeqRecord(seq=Seq('ATGCCGATCGATG', SingleLetterAlphabet()), id='Seq2', name='Seq2', description='Seq2'
         , dbxrefs=[]), 'Seq3': SeqRecord(seq=Seq('ATGCTCAGTCAGTAG', SingleLetterAlphabet()), id='Seq3', name='Seq3',
         description='Seq3', dbxrefs=[])}
+        >>> extract_seq_from_fasta("reads.fasta.gz", wanted_file, include=False, output="reads_filter.fasta.gz")
+        1250000
     """
-    from Bio import SeqIO
     from pathlib import Path
 
+    _check_engine(engine)
     wanted_file = Path(wanted_file).resolve()
     fasta_file = Path(fasta_file).resolve()
 
@@ -220,7 +1850,22 @@ def extract_seq_from_fasta(fasta_file, wanted_file, include=True):
     with open(wanted_file) as f:
         wanted = set([line.strip() for line in f if line != ""])
 
-    with open(fasta_file, "r") as handle:
+    if output is not None:
+        count_write = 0
+        with _open_fasta(fasta_file) as handle, _OutputHandle(output) as write:
+            for seq_id, description, sequence in _iter_fasta_handle(handle):
+                if (seq_id in wanted) == include:
+                    write(_format_fasta_record(description, sequence))
+                    count_write += 1
+        return count_write
+
+    if engine == "native":
+        with _open_fasta(fasta_file) as handle:
+            return _fasta_tuples_2_dict(record for record in _iter_fasta_handle(handle)
+                                        if (record[0] in wanted) == include)
+
+    from Bio import SeqIO
+    with _open_fasta(fasta_file, text=True) as handle:
         fasta_sequences = SeqIO.to_dict(SeqIO.parse(handle, "fasta"))
         fasta_sequences_del = fasta_sequences.copy()
     for seq in fasta_sequences:
@@ -231,7 +1876,7 @@ def extract_seq_from_fasta(fasta_file, wanted_file, include=True):
     return fasta_sequences_del
 
 
-def fasta_2_dict(fasta_file):
+def fasta_2_dict(fasta_file, engine="biopython", compact=False, cache=None):
     """
     Function that take a file name (fasta), and return a dictionnary of sequence
 
@@ -243,24 +1888,37 @@ def fasta_2_dict(fasta_file):
 
     Arguments:
         fasta_file (str): a path to fasta file directory
+        engine (str, optional): "biopython" (default) build ``SeqRecord`` values, "native" use :func:`iter_fasta`
+                                and return ``str`` values (several time faster)
+        compact (bool, optional): if True return a :class:`SequenceStore` (2-bit packed sequences, dict-like API),
+                                  `engine` is not used
+        cache (ParseCache, optional): a :class:`ParseCache` (or True for the default one) to load the parsed
+                                      records instead of parsing `fasta_file` again, with `compact` the packed
+                                      buffers of the store are mapped from the cache
 
     Returns:
         :class:`dict`: the fasta dict with sequence extract
 
+        :class:`SequenceStore`: with `compact`, the dict-like store of sequences
+
     Raises:
          ValueError: If `fasta_file` does not exist.
          ValueError: If `fasta_file` is not a valid file.
+         ValueError: If `engine` is not "biopython" or "native".
+         ValueError: If `fasta_file` contains duplicated ids.
 
     Example:
         >>> filename = "sequence.fasta"
+        >>> fasta_2_dict(filename, engine="native")
+        {'Seq1': 'ATGCTGCAGTAG', 'Seq2': 'ATGCCGATCGATG', 'Seq3': 'ATGCTCAGTCAGTAG'}
         >>> fasta_2_dict(filename)
         {'Seq1': SeqRecord(seq=Seq('ATGCTGCAGTAG', SingleLetterAlphabet()), id='Seq1', name='Seq1', description='Seq1', dbxrefs=[]),
         'Seq2': SeqRecord(seq=Seq('ATGCCGATCGATG', SingleLetterAlphabet()), id='Seq2', name='Seq2', description='Seq2', dbxrefs=[]),
         'Seq3': SeqRecord(seq=Seq('ATGCTCAGTCAGTAG', SingleLetterAlphabet()), id='Seq3', name='Seq3', description='Seq3', dbxrefs=[])}
     """
-    from Bio import SeqIO
     from pathlib import Path
 
+    _check_engine(engine)
     fasta_file = Path(fasta_file).resolve()
 
     if not fasta_file.exists():
@@ -268,11 +1926,139 @@ def fasta_2_dict(fasta_file):
     elif not fasta_file.is_file():
         raise ValueError(f'ERROR: "{fasta_file} " is not a valid file')
 
-    with open(fasta_file, "r") as handle:
+    cache = _get_cache(cache)
+    if cache is not None and compact:
+        return _sequence_store_cached(fasta_file, cache)
+    if cache is not None:
+        records = _fasta_records_cached(fasta_file, cache)
+        if engine == "native":
+            return _fasta_tuples_2_dict(records)
+        from Bio.Seq import Seq
+        from Bio.SeqRecord import SeqRecord
+        return _fasta_tuples_2_dict((seq_id, description,
+                                     SeqRecord(Seq(sequence), id=seq_id, name=seq_id, description=description))
+                                    for seq_id, description, sequence in records)
+
+    if compact:
+        return SequenceStore.from_fasta(fasta_file)
+
+    if engine == "native":
+        with _open_fasta(fasta_file) as handle:
+            return _fasta_tuples_2_dict(_iter_fasta_handle(handle))
+
+    from Bio import SeqIO
+    with _open_fasta(fasta_file, text=True) as handle:
         return SeqIO.to_dict(SeqIO.parse(handle, "fasta"))
 
 
-def len_seq_2_dict(fasta_file):
+def fasta_lengths(fasta_file, as_dict=False):
+    """
+    Function that take a file name (fasta), and return the length of each sequence without building any sequence.
+
+    Plain files are memory-mapped and the residues are counted per header directly on the bytes, so it run at
+    I/O speed. Gzip compressed files are streamed with :func:`iter_fasta`.
+
+    Notes:
+        function need modules:
+
+        - pathlib
+        - array
+        - mmap
+
+    Arguments:
+        fasta_file (str): a path to fasta file
+        as_dict (bool, optional): if True return a dict sorted by id like :func:`len_seq_2_dict`
+
+    Returns:
+        :class:`tuple`: (ids, lengths) two parallel arrays in file order, a :class:`list` of id and an
+        :class:`array.array` of unsigned int
+
+        :class:`dict`: with `as_dict`, the fasta dict with sequence length
+
+    Raises:
+         ValueError: If `fasta_file` does not exist.
+         ValueError: If `fasta_file` is not a valid file.
+         ValueError: If `as_dict` and `fasta_file` contains duplicated ids.
+
+    Example:
+        >>> ids, lengths = fasta_lengths("sequence.fasta")
+        >>> ids, lengths
+        (['Seq1', 'Seq2', 'Seq3'], array('Q', [12, 13, 15]))
+        >>> fasta_lengths("sequence.fasta", as_dict=True)
+        {'Seq1': 12, 'Seq2': 13, 'Seq3': 15}
+    """
+    from pathlib import Path
+    from array import array
+    import io
+    import mmap
+
+    fasta_file = Path(fasta_file).resolve()
+
+    if not fasta_file.exists():
+        raise ValueError(f'ERROR: file "{fasta_file}" does not exist')
+    elif not fasta_file.is_file():
+        raise ValueError(f'ERROR: "{fasta_file} " is not a valid file')
+
+    ids = []
+    lengths = array("Q")
+    with _open_fasta(fasta_file) as handle:
+        if isinstance(handle, io.BufferedReader) and fasta_file.stat().st_size:
+            with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                for seq_id, length in _scan_fasta_lengths(buffer):
+                    ids.append(seq_id)
+                    lengths.append(length)
+        else:
+            for seq_id, _, sequence in _iter_fasta_handle(handle):
+                ids.append(seq_id)
+                lengths.append(len(sequence))
+
+    if as_dict:
+        record_lengths = _fasta_tuples_2_dict((seq_id, None, length) for seq_id, length in zip(ids, lengths))
+        return {seq_id: record_lengths[seq_id] for seq_id in sorted(record_lengths.keys())}
+    return ids, lengths
+
+
+def iter_fasta(fasta_file):
+    """
+    Generator over a fasta file with a block-buffered tokenizer, without building any Biopython object.
+
+    Notes:
+        function need modules:
+
+        - pathlib
+
+    Arguments:
+        fasta_file (str): a path to fasta file, can be gzip or BGZF compressed (".gz", ".bgz")
+
+    Yields:
+        :class:`tuple`: (id, description, sequence) for each record, like ``SeqRecord.id``, ``SeqRecord.description``
+        and ``str(SeqRecord.seq)``
+
+    Raises:
+         ValueError: If `fasta_file` does not exist.
+         ValueError: If `fasta_file` is not a valid file.
+
+    Example:
+        >>> for seq_id, description, sequence in iter_fasta("sequence.fasta"):
+        >>>     print(seq_id, len(sequence))
+        Seq1 12
+        Seq2 13
+        Seq3 15
+    """
+    from pathlib import Path
+
+    fasta_file = Path(fasta_file).resolve()
+
+    if not fasta_file.exists():
+        raise ValueError(f'ERROR: file "{fasta_file}" does not exist')
+    elif not fasta_file.is_file():
+        raise ValueError(f'ERROR: "{fasta_file} " is not a valid file')
+
+    with _open_fasta(fasta_file) as handle:
+        yield from _iter_fasta_handle(handle)
+
+
+def len_seq_2_dict(fasta_file, engine="biopython"):
     """
     Function that take a file name (fasta), and return a dictionnary with length of sequence
 
@@ -284,6 +2070,7 @@ def len_seq_2_dict(fasta_file):
 
     Arguments:
         fasta_file (str): a path to fasta file directory
+        engine (str, optional): "biopython" (default) or "native" to count residues with :func:`fasta_lengths`
 
     Returns:
         :class:`dict`: the fasta dict with sequence length
@@ -291,15 +2078,16 @@ def len_seq_2_dict(fasta_file):
     Raises:
          ValueError: If `fasta_file` does not exist.
          ValueError: If `fasta_file`` is not a valid file.
+         ValueError: If `engine` is not "biopython" or "native".
 
     Example:
         >>> filename = "sequence.fasta"
         >>> len_seq_2_dict(filename)
         {'Seq1': 12, 'Seq2': 13, 'Seq3': 15}
     """
-    from Bio import SeqIO
     from pathlib import Path
 
+    _check_engine(engine)
     fasta_file = Path(fasta_file).resolve()
     dico_lenght = {}
 
@@ -308,7 +2096,11 @@ def len_seq_2_dict(fasta_file):
     elif not fasta_file.is_file():
         raise ValueError(f'ERROR: "{fasta_file} " is not a valid file')
 
-    with open(fasta_file, "r") as handle:
+    if engine == "native":
+        return fasta_lengths(fasta_file, as_dict=True)
+
+    from Bio import SeqIO
+    with _open_fasta(fasta_file, text=True) as handle:
         record_dict = SeqIO.to_dict(SeqIO.parse(handle, "fasta"))
 
     for gene in sorted(record_dict.keys()):
@@ -318,56 +2110,1010 @@ def len_seq_2_dict(fasta_file):
     return dico_lenght
 
 
-def nb_seq_files_2_dict(path_directory):
+def merge_fasta_shards(manifest, fasta_out):
     """
-    Function  that take a Path Directory and returna dictionnary with number of sequences in fasta file's
+    Function that reassemble the shards written by :func:`split_fasta` in the original order.
 
-    :param pathDirectory: a directory Path
-    :type pathDirectory: Path
-    :rtype: dict1(), dict2()
-    :return: - contient le nombre de sequences dans les fichiers (key = nom de fichier value =  nombre de sequences)\n
-             - contient le nombre de fichier qui ont x sequences (key = nombre de sequence =  nombre de fichier)
-    :raise print: print("ERROR: Sequence: "+nameFichier+" allready read") with nameFichier is the current file read.
+    Notes:
+        function need modules:
+
+        - pathlib
+
+    Arguments:
+        manifest (str): a path to the manifest file of :func:`split_fasta`
+        fasta_out (str): a path to write the merged fasta file (compressed with ".gz" or ".bgz" extension)
+
+    Returns:
+        :class:`str`: the output fasta file name
+
+    Raises:
+         ValueError: If `manifest` or a shard does not exist.
 
     Example:
-        >>> dico1,dico2 = nbSeqInFile2dict(path/to/directory/)
-        >>> print(dict2txt(dico1))
-        ./out/gemo10_4497_ortho_rename_add.fasta	58
-        ./out/gemo10_6825_ortho_rename_add.fasta	59
-        ./out/gemo10_3497_ortho_rename_add.fasta	59
-        ./out/gemo10_6254_ortho_rename_add.fasta	59
-        >>> print(dict2txt(dico2))
+        >>> merge_fasta_shards("shards/genome_manifest.tsv", "genome_annotated.fasta")
+        '/path/to/genome_annotated.fasta'
+    """
+    from pathlib import Path
+
+    manifest = Path(manifest).resolve()
+    if not manifest.exists():
+        raise ValueError(f'ERROR: file "{manifest}" does not exist')
+    with open(manifest, "r") as manifest_handle:
+        shards = [line.split("\t")[1] for line in manifest_handle if line.strip() and not line.startswith("#")]
+    for shard in shards:
+        if not Path(shard).exists():
+            raise ValueError(f'ERROR: shard "{shard}" of "{manifest}" does not exist')
+
+    with _OutputHandle(fasta_out, binary=True) as write:
+        for shard in shards:
+            with _open_fasta(shard) as handle:
+                for block in iter(lambda: handle.read(_FASTA_BLOCK_SIZE * 8), b""):
+                    write(block)
+    return _output_name(fasta_out)
+
+
+def nb_seq_files_2_dict(path_directory, workers=1, prefetch=0):
+    """
+    Function  that take a Path Directory and returna dictionnary with number of sequences in fasta file's
+
+    Records are not parsed: the record starts (">" at the begin of a line) are counted on large binary chunks,
+    and the files are spread on `workers` processes.
+
+    Notes:
+        function need modules:
+
+        - pathlib
+        - concurrent.futures
+
+    Arguments:
+        path_directory (str): a path to fasta file directory ( file with extention "fa", "fasta", "fas", can be gzip
+                              compressed )
+        workers (int, optional): number of processes used to scan the files. Default=1
+        prefetch (int, optional): number of files read ahead by :class:`PrefetchReader` threads while the current
+                                  one is scanned (single process only), 0 to disable. Default=0
+
+    Returns:
+        :class:`tuple`: two :class:`dict`
+
+        - the number of sequences in each file (key = file name without extension, value = number of sequences)
+        - the number of files with x sequences (key = number of sequences, value = number of files)
+
+    Raises:
+         ValueError: If `path_directory` does not exist.
+         ValueError: If `path_directory` is not a valid directory.
+         ValueError: If `workers` is not a positive integer.
+         ValueError: If `prefetch` is not a positive integer or 0.
+
+    Example:
+        >>> dico1, dico2 = nb_seq_files_2_dict("path/to/directory/", workers=8)
+        >>> print(dict_2_txt(dico1))
+        gemo10_3497_ortho_rename_add	59
+        gemo10_4497_ortho_rename_add	58
+        gemo10_6254_ortho_rename_add	59
+        gemo10_6825_ortho_rename_add	59
+        >>> print(dict_2_txt(dico2))
         58	1
         59	3
     """
+    from pathlib import Path
+
+    _check_workers(workers)
+    if not Path(path_directory).exists():
+        raise ValueError(f'ERROR: directory "{path_directory}" does not exist')
+    elif not Path(path_directory).is_dir():
+        raise ValueError(f'ERROR: "{path_directory} " is not a valid directory')
+
+    path_directory = Path(path_directory).resolve()
+    fasta_files_list = _fasta_files_in(path_directory)
+
+    dico_nb_seq_in_files = {}
+    dico_nb_files_nb_seq = {}
+    nb_seq_list = _map_files(_count_fasta_records, fasta_files_list, workers, prefetch)
+    for fasta_file, nb_seq in zip(fasta_files_list, nb_seq_list):
+        name_file = _fasta_file_stem(fasta_file.name)
+        if name_file not in dico_nb_seq_in_files:
+            dico_nb_seq_in_files[name_file] = nb_seq
+        else:
+            print(f"ERROR: Sequence: {name_file} allready read")
+        dico_nb_files_nb_seq[nb_seq] = dico_nb_files_nb_seq.get(nb_seq, 0) + 1
+    return dico_nb_seq_in_files, dico_nb_files_nb_seq
+
+
+def split_fasta(fasta_file, path_directory_out, nb_shards=None, by="records", shard_size=None, prefix=None,
+                extension=".fasta", wrap=60):
+    """
+    Function that split a fasta file in shards of consecutive records, streaming one record at a time.
+
+    Shards are balanced by number of records or of residues (`nb_shards` and `by`), or filled up to a number of
+    residues (`shard_size`). Only the current shard is open and only the current record is in memory. To balance
+    `nb_shards`, the total is first computed with :func:`fasta_lengths` (byte scan, no parsing).
 
-    dicoNbSeqInFiles = {}
-    dicoNbFilesNbSouche = {}
-    # récupération des fichiers du repertoire
-    if pathDirectory[-1] != "*":
-        pathDirectory += "*"
-    directoryFiles = glob.glob(pathDirectory)
-    # Ouverture des fichiers du repertoire pour stocker les sequences en mémoire
-    for fichier in directoryFiles:
+    A manifest ``<prefix>_manifest.tsv`` give for each shard in order: the number, path, first id, last id,
+    number of records and residues, so :func:`merge_fasta_shards` can reassemble them in the original order.
+
+    Notes:
+        function need modules:
+
+        - pathlib
+
+    Arguments:
+        fasta_file (str): a path to fasta file, can be gzip or BGZF compressed
+        path_directory_out (str): a directory path to write the shards and the manifest
+        nb_shards (int, optional): the number of shards to write
+        by (str, optional): balance `nb_shards` on "records" (default) or "residues"
+        shard_size (int, optional): the number of residues by shard (instead of `nb_shards`), a record is never split
+        prefix (str, optional): the shards name prefix, default the `fasta_file` name without extensions
+        extension (str, optional): the shards extension, ".gz" or ".bgz" at end compress them. Default=".fasta"
+        wrap (int, optional): the length of sequence lines, 0 or None to write each sequence on one line. Default=60
+
+    Returns:
+        :class:`str`: the manifest file name
+
+    Raises:
+         ValueError: If `fasta_file` does not exist.
+         ValueError: If `fasta_file` is not a valid file.
+         ValueError: If none or both of `nb_shards` and `shard_size` are set, or if they are not positive.
+         ValueError: If `by` is not "records" or "residues".
+         ValueError: If `wrap` is not a positive integer, 0 or None.
+
+    Example:
+        >>> split_fasta("proteome.fasta", "shards/", nb_shards=100, by="residues")
+        '/path/to/shards/proteome_manifest.tsv'
+        >>> split_fasta("reads.fasta.gz", "shards/", shard_size=50000000, extension=".fasta.gz")
+        '/path/to/shards/reads_manifest.tsv'
+    """
+    from contextlib import ExitStack
+    from pathlib import Path
+
+    fasta_file = Path(fasta_file).resolve()
+    if not fasta_file.exists():
+        raise ValueError(f'ERROR: file "{fasta_file}" does not exist')
+    elif not fasta_file.is_file():
+        raise ValueError(f'ERROR: "{fasta_file} " is not a valid file')
+    if (nb_shards is None) == (shard_size is None):
+        raise ValueError('ERROR: set one of "nb_shards" or "shard_size"')
+    if not isinstance(nb_shards or shard_size, int) or (nb_shards or shard_size) < 1:
+        raise ValueError(f'ERROR: "{nb_shards or shard_size}" must be a positive integer')
+    if by not in ("records", "residues"):
+        raise ValueError(f'ERROR: by "{by}" must be "records" or "residues"')
+    _check_wrap(wrap)
+
+    path_directory_out = Path(path_directory_out).resolve()
+    path_directory_out.mkdir(parents=True, exist_ok=True)
+    prefix = prefix or fasta_file.name.split(".")[0]
+
+    if nb_shards is not None:
+        _, lengths = fasta_lengths(fasta_file)
+        total = len(lengths) if by == "records" else sum(lengths)
+        boundaries = [total * (i + 1) / nb_shards for i in range(nb_shards)]
+        digits = len(str(nb_shards))
+    else:
+        by = "residues"
+        boundaries = None
+        digits = 4
+
+    manifest_rows = []
+    done = 0
+    write = None
+    # only the current shard is open on `shard_output`, closed when the next one start
+    with ExitStack() as shard_output, _open_fasta(fasta_file) as handle:
+        for seq_id, description, sequence in _iter_fasta_handle(handle):
+            weight = 1 if by == "records" else len(sequence)
+            if write is not None and manifest_rows[-1][4]:
+                if boundaries is not None:
+                    new_shard = done >= boundaries[len(manifest_rows) - 1] and len(manifest_rows) < nb_shards
+                else:
+                    new_shard = manifest_rows[-1][5] + len(sequence) > shard_size
+                if new_shard:
+                    shard_output.close()
+                    write = None
+            if write is None:
+                shard = path_directory_out.joinpath(f"{prefix}_{len(manifest_rows) + 1:0{digits}d}{extension}")
+                write = shard_output.enter_context(_OutputHandle(shard))
+                manifest_rows.append([len(manifest_rows) + 1, shard.as_posix(), seq_id, seq_id, 0, 0])
+            write(_format_fasta_record(description, sequence, wrap))
+            manifest_rows[-1][3] = seq_id
+            manifest_rows[-1][4] += 1
+            manifest_rows[-1][5] += len(sequence)
+            done += weight
+
+    manifest = path_directory_out.joinpath(f"{prefix}_manifest.tsv")
+    with open(manifest, "w") as manifest_handle:
+        manifest_handle.write("#shard\tpath\tfirst_id\tlast_id\trecords\tresidues\n")
+        for row in manifest_rows:
+            manifest_handle.write("\t".join(map(str, row)) + "\n")
+    return manifest.as_posix()
+
+
+class FastaIndex:
+    """
+    Random access to a fasta file through a samtools-compatible ``.fai`` index.
+
+    The ``.fai`` file next to the fasta is reused if it is up to date, else it is built (and written when the
+    directory is writable). Each fetch seeks directly to the byte offset of the region, so a lookup cost a few
+    reads whatever the size of the reference.
+
+    BGZF compressed fasta (``bgzip`` or :func:`dict_2_fasta` with ``compress="bgzf"``) are indexed too: offsets
+    of the ``.fai`` are on the uncompressed data and a samtools-compatible ``.gzi`` file give the block of each
+    offset, so a fetch only decompress the blocks of the region.
+
+    ``.fai`` columns are:
+
+    ==========  ===========================================================
+    column      infos
+    ==========  ===========================================================
+    NAME        id of the sequence
+    LENGTH      number of bases
+    OFFSET      byte offset of the first base
+    LINEBASES   number of bases per line
+    LINEWIDTH   number of bytes per line (bases + end of line)
+    ==========  ===========================================================
+
+    Notes:
+        class need modules:
+
+        - pathlib
+
+    Arguments:
+        fasta_file (str): a path to fasta file
+        fai_file (str, optional): a path to the index, default is `fasta_file` + ".fai"
+        rebuild (bool, optional): if True build the index even if an up to date ``.fai`` exists
+        gzi_file (str, optional): a path to the BGZF index, default is `fasta_file` + ".gzi"
+
+    Raises:
+         ValueError: If `fasta_file` does not exist.
+         ValueError: If `fasta_file` is not a valid file.
+         ValueError: If `fasta_file` is gzip compressed but not BGZF.
+         ValueError: If `fasta_file` has different line length inside a sequence or duplicated ids.
+
+    Example:
+        >>> with FastaIndex("genome.fasta") as index:
+        >>>     print(index.fetch_region("chr3:1,200,001-1,200,012"))
+        >>>     print(index.fetch("chr3", 1200001, 1200012))
+        >>>     print(len(index["chr1"]))
+        ATGCTGCAGTAG
+        ATGCTGCAGTAG
+        3133578
+    """
+
+    def __init__(self, fasta_file, fai_file=None, rebuild=False, gzi_file=None):
+        from pathlib import Path
+        from collections import namedtuple
+
+        self.fasta_file = Path(fasta_file).resolve()
+        if not self.fasta_file.exists():
+            raise ValueError(f'ERROR: file "{self.fasta_file}" does not exist')
+        elif not self.fasta_file.is_file():
+            raise ValueError(f'ERROR: "{self.fasta_file} " is not a valid file')
+
+        self.bgzf = _is_bgzf(self.fasta_file)
+        with open(self.fasta_file, "rb") as handle:
+            if not self.bgzf and handle.read(2) == b"\x1f\x8b":
+                raise ValueError(f'ERROR: "{self.fasta_file}" is gzip compressed, recompress it with bgzip for '
+                                 f'random access')
+        self.gzi_file = Path(gzi_file).resolve() if gzi_file else Path(f"{self.fasta_file}.gzi")
+        self.fai_file = Path(fai_file).resolve() if fai_file else Path(f"{self.fasta_file}.fai")
+        self.FaiRecord = namedtuple("FaiRecord", ["length", "offset", "linebases", "linewidth"])
+        self.records = {}
+        if not rebuild and self.fai_file.exists() and \
+                self.fai_file.stat().st_mtime >= self.fasta_file.stat().st_mtime:
+            self._load_fai()
+        else:
+            self._build_fai()
+            try:
+                self._write_fai()
+            except OSError:
+                pass
+        if self.bgzf:
+            self._reader = _BgzfReader(self.fasta_file, self._load_gzi(rebuild))
+            self._read = self._reader.read
+        else:
+            self._reader = open(self.fasta_file, "rb")
+            self._read = self._read_plain
+
+    def _read_plain(self, offset, size):
+        """Read `size` bytes at `offset` of the plain fasta file"""
+        self._reader.seek(offset)
+        return self._reader.read(size)
+
+    def _load_gzi(self, rebuild=False):
+        """Return the BGZF blocks from the ``.gzi`` file if up to date, else scan them and write the ``.gzi``"""
+        import struct
+        if not rebuild and self.gzi_file.exists() and \
+                self.gzi_file.stat().st_mtime >= self.fasta_file.stat().st_mtime:
+            with open(self.gzi_file, "rb") as gzi:
+                nb_blocks = struct.unpack("<Q", gzi.read(8))[0]
+                offsets = struct.unpack(f"<{2 * nb_blocks}Q", gzi.read(16 * nb_blocks))
+            return [(0, 0)] + list(zip(offsets[0::2], offsets[1::2]))
+        with open(self.fasta_file, "rb") as handle:
+            blocks = _BgzfReader.scan_blocks(handle)
         try:
-            nameFichier = fichier.split("/")[-1].split(".")[0]
-            extentionFichier = fichier.split("/")[-1].split(".")[1]
-        except:
-            extentionFichier = "directory"
-        if extentionFichier in ["fasta", "fa", "fas"]:
-            # Ouverture des sequences fasta et chargement dans dictionnaire
-            handle = open(fichier, "r")
-            record_dict = SeqIO.to_dict(SeqIO.parse(handle, "fasta"))
-            handle.close()
-            nbseq = len(record_dict.keys())
-            # print(nameFichier+"\t"+str(nbseq))
-            if nameFichier not in dicoNbSeqInFiles.keys():
-                dicoNbSeqInFiles[nameFichier] = nbseq
-            else:
-                print("ERROR: Sequence: " + nameFichier + " allready read")
+            with open(self.gzi_file, "wb") as gzi:
+                gzi.write(struct.pack("<Q", len(blocks) - 1))
+                gzi.write(struct.pack(f"<{2 * (len(blocks) - 1)}Q",
+                                      *(offset for block in blocks[1:] for offset in block)))
+        except OSError:
+            pass
+        return blocks
+
+    def _load_fai(self):
+        """Load an existing ``.fai`` file"""
+        with open(self.fai_file, "r") as fai:
+            for line in fai:
+                name, length, offset, linebases, linewidth = line.rstrip("\n").split("\t")[:5]
+                self.records[name] = self.FaiRecord(int(length), int(offset), int(linebases), int(linewidth))
+
+    def _build_fai(self):
+        """Scan the fasta file line by line to compute the ``.fai`` records"""
+        name = None
+        length = offset = linebases = linewidth = 0
+        last_bases = last_width = None
+        position = 0
+
+        def close_record():
+            if name is not None:
+                if name in self.records:
+                    raise ValueError(f'ERROR: duplicated id "{name}" in "{self.fasta_file}"')
+                self.records[name] = self.FaiRecord(length, offset, linebases, linewidth)
+
+        with _open_fasta(self.fasta_file) as handle:
+            for line in handle:
+                width = len(line)
+                if line.startswith(b">"):
+                    close_record()
+                    name = line[1:].decode().split(None, 1)[0] if line[1:].strip() else ""
+                    length = linebases = linewidth = 0
+                    last_bases = last_width = None
+                    offset = position + width
+                elif name is not None:
+                    bases = len(line.rstrip(b"\r\n"))
+                    # only the last line of a sequence can be shorter, no line can be longer than the first one
+                    if (bases and last_bases is not None and (last_bases != linebases or last_width != linewidth)) \
+                            or (linebases and bases > linebases):
+                        raise ValueError(f'ERROR: different line length in sequence "{name}" of '
+                                         f'"{self.fasta_file}", can not index it')
+                    if not linebases:
+                        linebases, linewidth = bases, width
+                    length += bases
+                    last_bases, last_width = bases, width
+                position += width
+            close_record()
+
+    def _write_fai(self):
+        """Write the ``.fai`` file"""
+        with open(self.fai_file, "w") as fai:
+            for name, record in self.records.items():
+                fai.write(f"{name}\t{record.length}\t{record.offset}\t{record.linebases}\t{record.linewidth}\n")
+
+    def fetch(self, name, start=None, end=None):
+        """Return the sequence of `name` between 1-based inclusive `start` and `end` (default whole sequence)
+
+        Arguments:
+            name (str): id of the sequence
+            start (int, optional): 1-based first position, default 1
+            end (int, optional): 1-based last position (include), default the length of the sequence
+
+        Returns:
+            :class:`str`: the sequence
+
+        Raises:
+             KeyError: If `name` is not in the index.
+             ValueError: If `start` is greater than `end`.
+        """
+        if name not in self.records:
+            raise KeyError(f'ERROR: "{name}" is not in "{self.fasta_file}"')
+        record = self.records[name]
+        start = 0 if start is None else max(int(start) - 1, 0)
+        end = record.length if end is None else min(int(end), record.length)
+        if start > end:
+            raise ValueError(f'ERROR: start "{start + 1}" is greater than end "{end}"')
+        if start == end:
+            return ""
+        first_byte = record.offset + (start // record.linebases) * record.linewidth + start % record.linebases
+        last_byte = record.offset + ((end - 1) // record.linebases) * record.linewidth + (end - 1) % record.linebases
+        return self._read(first_byte, last_byte - first_byte + 1).translate(None, b"\r\n").decode("latin-1")
+
+    def fetch_region(self, region):
+        """Return the sequence of a samtools-like region string "name", "name:start" or "name:start-end"
+
+        Arguments:
+            region (str): the region, commas on positions are allowed ("chr3:1,200,000-1,250,000")
+
+        Returns:
+            :class:`str`: the sequence
+        """
+        return self.fetch(*_parse_region(region, self.records))
+
+    def length(self, name):
+        """Return the length of sequence `name`"""
+        return self.records[name].length
+
+    def keys(self):
+        """Return the ids of the indexed sequences"""
+        return self.records.keys()
+
+    def close(self):
+        """Close the fasta file handle"""
+        self._reader.close()
+
+    def __getitem__(self, name):
+        return self.fetch(name)
+
+    def __contains__(self, name):
+        return name in self.records
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __len__(self):
+        return len(self.records)
 
-            dicoNbFilesNbSouche[nbseq] = (dicoNbFilesNbSouche.get(nbseq, 1)) + 1
-    return dicoNbSeqInFiles, dicoNbFilesNbSouche
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.fasta_file.as_posix()!r})"
+
+
+class SequenceStore:
+    """
+    Compact in-memory store of sequences with a dict-like API.
+
+    All sequences are packed on one contiguous buffer with 2 bits by base (A, C, G, T), runs of other characters
+    (N, IUPAC codes, gaps) are kept on an exception list and lower case runs (soft-masking) on a mask list, with
+    offset arrays by record. A genome take about a quarter of its size in memory and ``store[id]`` rebuild the
+    sequence string in O(1) lookup.
+
+    Notes:
+        class need modules:
+
+        - array
+        - re
+
+    Example:
+        >>> store = fasta_2_dict("genome.fasta", compact=True)
+        >>> len(store), store.nbytes
+        (171, 9812345)
+        >>> store["Seq1"]
+        'ATGCTGCAGTAGNNNNacgt'
+        >>> for seq_id, seq in store.items():
+        >>>     print(seq_id, len(seq))
+    """
+
+    _array_names = ("_offsets", "_lengths", "_exception_offsets", "_exception_starts", "_exception_lengths",
+                    "_mask_offsets", "_mask_starts", "_mask_lengths")
+
+    def __init__(self):
+        from array import array
+        self._index = {}
+        self._ids = []
+        self._packed = bytearray()
+        self._offsets = array("Q")
+        self._lengths = array("Q")
+        self._exception_offsets = array("Q", [0])
+        self._exception_starts = array("Q")
+        self._exception_lengths = array("Q")
+        self._exception_chars = bytearray()
+        self._mask_offsets = array("Q", [0])
+        self._mask_starts = array("Q")
+        self._mask_lengths = array("Q")
+
+    @classmethod
+    def from_fasta(cls, fasta_file):
+        """Return a :class:`SequenceStore` of all the records of `fasta_file` (can be gzip compressed)
+
+        Raises:
+             ValueError: If `fasta_file` contains duplicated ids.
+        """
+        store = cls()
+        for seq_id, _, sequence in iter_fasta(fasta_file):
+            store.add(seq_id, sequence)
+        return store
+
+    def _to_cache(self):
+        """Return the :class:`ParseCache` entry of the store: the ids and the packed buffers as they are"""
+        return _cache_sections(_CACHE_TWOBIT_MAGIC, {"ids": self._ids},
+                               [self._packed, self._exception_chars,
+                                *(getattr(self, name) for name in self._array_names)])
+
+    @classmethod
+    def _from_cache(cls, buffer):
+        """
+        Return the store of a cache entry of :meth:`_to_cache` mapped on `buffer`: the packed buffers are read
+        on the mapping without copy (the store keep it open). Return None (and close `buffer`) if not valid.
+        """
+        entry = _cache_sections_load(buffer, _CACHE_TWOBIT_MAGIC, ("B", "B") + ("Q",) * len(cls._array_names))
+        if entry is None:
+            buffer.close()
+            return None
+        header, sections = entry
+        store = cls()
+        store._ids = header["ids"]
+        store._index = {seq_id: row for row, seq_id in enumerate(store._ids)}
+        store._packed = sections[0]
+        store._exception_chars = bytes(sections[1])
+        sections[1].release()
+        for name, section in zip(cls._array_names, sections[2:]):
+            setattr(store, name, section)
+        return store
+
+    def _unmap(self):
+        """Copy the buffers mapped by :meth:`_from_cache` to memory, so sequences can be added"""
+        from array import array
+        self._packed = bytearray(self._packed)
+        for name in self._array_names:
+            values = array("Q")
+            values.frombytes(getattr(self, name).cast("B"))
+            setattr(self, name, values)
+
+    def add(self, seq_id, sequence):
+        """Add a sequence (``str``, ``bytes``, ``Seq`` or ``SeqRecord``) to the store
+
+        Raises:
+             ValueError: If `seq_id` is already on the store.
+        """
+        import re
+        if seq_id in self._index:
+            raise ValueError(f"Duplicate key '{seq_id}'")
+        if isinstance(self._packed, memoryview):
+            self._unmap()
+        data = _sequence_2_str(sequence).encode("latin-1")
+        upper = data.upper()
+
+        codes = upper.translate(_TWOBIT_ENCODE) + b"\x00" * (-len(data) % 4)
+        nbytes = len(codes) // 4
+        packed = 0
+        for shift, start in ((6, 0), (4, 1), (2, 2), (0, 3)):
+            packed |= int.from_bytes(codes[start::4], "big") << shift
+
+        self._index[seq_id] = len(self._ids)
+        self._ids.append(seq_id)
+        self._offsets.append(len(self._packed))
+        self._lengths.append(len(data))
+        self._packed += packed.to_bytes(nbytes, "big")
+        # regex scans are skipped for the common case of pure ACGT or pure upper case sequences
+        if upper.translate(None, b"ACGT"):
+            for match in re.finditer(rb"([^ACGT])\1*", upper):
+                self._exception_starts.append(match.start())
+                self._exception_lengths.append(match.end() - match.start())
+                self._exception_chars += match.group(1)
+        self._exception_offsets.append(len(self._exception_starts))
+        if upper != data:
+            for match in re.finditer(rb"[a-z]+", data):
+                self._mask_starts.append(match.start())
+                self._mask_lengths.append(match.end() - match.start())
+        self._mask_offsets.append(len(self._mask_starts))
+
+    def _decode(self, row):
+        """Rebuild the sequence string of record number `row`"""
+        length = self._lengths[row]
+        nbytes = (length + 3) // 4
+        offset = self._offsets[row]
+        packed = int.from_bytes(self._packed[offset:offset + nbytes], "big")
+        mask = int.from_bytes(b"\x03" * nbytes, "big")
+        codes = bytearray(nbytes * 4)
+        for shift, start in ((6, 0), (4, 1), (2, 2), (0, 3)):
+            codes[start::4] = ((packed >> shift) & mask).to_bytes(nbytes, "big")
+        sequence = bytearray(bytes(codes[:length]).translate(_TWOBIT_DECODE))
+        for i in range(self._exception_offsets[row], self._exception_offsets[row + 1]):
+            start, run = self._exception_starts[i], self._exception_lengths[i]
+            sequence[start:start + run] = self._exception_chars[i:i + 1] * run
+        for i in range(self._mask_offsets[row], self._mask_offsets[row + 1]):
+            start, run = self._mask_starts[i], self._mask_lengths[i]
+            sequence[start:start + run] = sequence[start:start + run].lower()
+        return sequence.decode("latin-1")
+
+    @property
+    def nbytes(self):
+        """Number of bytes used by the sequence buffers and offset arrays (without ids)"""
+        arrays = [getattr(self, name) for name in self._array_names]
+        return len(self._packed) + len(self._exception_chars) + sum(len(a) * a.itemsize for a in arrays)
+
+    def length(self, seq_id):
+        """Return the length of sequence `seq_id` without decoding it"""
+        return self._lengths[self._index[seq_id]]
+
+    def get(self, seq_id, default=None):
+        """Return the sequence of `seq_id` if on the store, else `default`"""
+        if seq_id in self._index:
+            return self._decode(self._index[seq_id])
+        return default
+
+    def keys(self):
+        """Return the ids of the store"""
+        return self._index.keys()
+
+    def values(self):
+        """Generator of the sequences of the store"""
+        return (self._decode(row) for row in range(len(self._ids)))
+
+    def items(self):
+        """Generator of (id, sequence) of the store"""
+        return ((seq_id, self._decode(row)) for row, seq_id in enumerate(self._ids))
+
+    def __getitem__(self, seq_id):
+        return self._decode(self._index[seq_id])
+
+    def __contains__(self, seq_id):
+        return seq_id in self._index
+
+    def __iter__(self):
+        return iter(self._ids)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({len(self)} sequences, {self.nbytes} bytes)"
+
+
+class ParseCache:
+    """
+    Persistent on-disk cache of parsed FASTA and GFF files.
+
+    Each parsed file is stored as one compact binary entry on `cache_dir`, keyed on the resolved path, the size,
+    the modification time and optionally a hash of the content, so any change of the input invalidates its entry.
+    Entries are loaded back with memory-mapping. When the cache exceed `max_size` bytes, the least recently used
+    entries are removed.
+
+    Entries only hold a JSON header and raw arrays (GFF columns, attribute strings, 2-bit packed sequences), never
+    pickles, so loading an entry from a shared cache directory can not run code.
+
+    Use it with ``fasta_2_dict(..., cache=...)`` and ``ParseGFF.parseGFF3(cache=...)``, ``cache=True`` use a
+    :class:`ParseCache` with default arguments.
+
+    Notes:
+        class need modules:
+
+        - pathlib
+        - hashlib
+        - mmap
+
+    Arguments:
+        cache_dir (str, optional): the cache directory, default is $YODA_POWERS_CACHE or ~/.cache/yoda_powers
+        max_size (int, optional): maximum size of the cache in bytes. Default=2 GiB
+        content_hash (bool, optional): if True also key entries on a hash of the file content. Default=False
+
+    Example:
+        >>> cache = ParseCache("/scratch/yoda_cache", max_size=10 * 1024 ** 3)
+        >>> dico = fasta_2_dict("genome.fasta", engine="native", cache=cache)  # parse and store
+        >>> dico = fasta_2_dict("genome.fasta", engine="native", cache=cache)  # load from cache
+        >>> cache.size
+        38765432
+        >>> cache.clear()
+        1
+    """
+
+    def __init__(self, cache_dir=None, max_size=2 * 1024 ** 3, content_hash=False):
+        import os
+        from pathlib import Path
+        if cache_dir is None:
+            cache_dir = os.environ.get("YODA_POWERS_CACHE", Path.home().joinpath(".cache", "yoda_powers"))
+        self.cache_dir = Path(cache_dir).resolve()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+        self.content_hash = content_hash
+
+    def key(self, filename, kind):
+        """Return the cache key of `filename` parsed as `kind` ("fasta", "gff", ...)"""
+        import hashlib
+        from pathlib import Path
+        filename = Path(filename).resolve()
+        stat = filename.stat()
+        key = f"{_CACHE_VERSION}|{kind}|{filename.as_posix()}|{stat.st_size}|{stat.st_mtime_ns}"
+        if self.content_hash:
+            digest = hashlib.blake2b(digest_size=16)
+            with open(filename, "rb") as handle:
+                for block in iter(lambda: handle.read(_FASTA_BLOCK_SIZE * 8), b""):
+                    digest.update(block)
+            key += f"|{digest.hexdigest()}"
+        return f"{kind}-{hashlib.blake2b(key.encode(), digest_size=16).hexdigest()}"
+
+    def load(self, filename, kind):
+        """Return the entry of `filename` as a read-only :class:`mmap.mmap` (to close), or None if not cached"""
+        import mmap
+        import os
+        entry = self.cache_dir.joinpath(self.key(filename, kind))
+        try:
+            with open(entry, "rb") as handle:
+                buffer = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        try:
+            # mark as recently used, not allowed on the entries of other users of a shared cache
+            os.utime(entry)
+        except OSError:
+            pass
+        return buffer
+
+    def store(self, filename, kind, data):
+        """
+        Store the bytes `data` as the entry of `filename` then evict old entries (never this one). Nothing is
+        stored if `data` is larger than `max_size`.
+        """
+        import os
+        if len(data) > self.max_size:
+            return
+        entry = self.cache_dir.joinpath(self.key(filename, kind))
+        tmp_entry = entry.with_name(f"{entry.name}.{os.getpid()}.tmp")
+        with open(tmp_entry, "wb") as handle:
+            handle.write(data)
+        os.replace(tmp_entry, entry)
+        self.evict(keep=entry)
+
+    def _entries(self):
+        """Return the paths of the cache entries, only the names made by :meth:`key` (other files are left alone)"""
+        import re
+        pattern = re.compile(f"(?:{'|'.join(_CACHE_KINDS)})-[0-9a-f]{{32}}")
+        return [entry for entry in self.cache_dir.iterdir() if pattern.fullmatch(entry.name) and entry.is_file()]
+
+    @property
+    def size(self):
+        """Total size of the cache entries in bytes"""
+        return sum(entry.stat().st_size for entry in self._entries())
+
+    def evict(self, max_size=None, keep=None):
+        """Remove least recently used entries until the cache size is under `max_size` (default self.max_size)
+
+        Arguments:
+            max_size (int, optional): the maximum size of the cache in bytes, default self.max_size
+            keep (Path, optional): an entry never removed (ie the one just stored)
+
+        Returns:
+            :class:`int`: the number of entries removed
+        """
+        max_size = self.max_size if max_size is None else max_size
+        entries = sorted(((entry.stat(), entry) for entry in self._entries()), key=lambda item: item[0].st_mtime)
+        total = sum(stat.st_size for stat, _ in entries)
+        count_remove = 0
+        for stat, entry in entries:
+            if total <= max_size:
+                break
+            if entry == keep:
+                continue
+            try:
+                entry.unlink()
+            except OSError:
+                # removed by another process, or owned by another user of a shared cache
+                continue
+            total -= stat.st_size
+            count_remove += 1
+        return count_remove
+
+    def clear(self):
+        """Remove all the cache entries
+
+        Returns:
+            :class:`int`: the number of entries removed
+        """
+        return self.evict(max_size=0)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.cache_dir.as_posix()!r}, max_size={self.max_size})"
+
+
+class PrefetchReader:
+    """
+    Ordered reader of many files, with a bounded pool of threads reading the upcoming files while the current one
+    is processed.
+
+    Iterate on ``(file, content)`` pairs in the order of `files`, `content` is the whole file as ``bytes`` (gzip
+    and BGZF files are decompressed on the threads). At most `depth` files are read ahead, so memory is bounded by
+    the size of `depth` + 1 files. With ``depth=0`` files are read on the calling thread.
+
+    It is used by the directory functions (:func:`assembly_stats`, :func:`concat_fasta_files`,
+    :func:`convert_fasta_2_nexus` and :func:`nb_seq_files_2_dict`) to hide the latency of network file systems.
+
+    Notes:
+        class need modules:
+
+        - concurrent.futures
+        - collections
+
+    Arguments:
+        files (list): the paths of files to read
+        depth (int, optional): the number of files read ahead. Default=4
+        threads (int, optional): the number of reading threads, default is `depth`
+        return_exceptions (bool, optional): if True a read error is given as `content` instead of raised. Default=False
+
+    Raises:
+         ValueError: If `depth` is not a positive integer or 0.
+         ValueError: If `threads` is not a positive integer.
+
+    Example:
+        >>> with PrefetchReader(sorted(Path("genes/").glob("*.fasta")), depth=8) as reader:
+        ...     for fasta_file, content in reader:
+        ...         print(fasta_file.name, content.count(b">"))
+        gene1.fasta 52
+        gene2.fasta 49
+    """
+
+    def __init__(self, files, depth=4, threads=None, return_exceptions=False):
+        if not isinstance(depth, int) or isinstance(depth, bool) or depth < 0:
+            raise ValueError(f'ERROR: depth "{depth}" must be a positive integer or 0')
+        if threads is not None:
+            _check_workers(threads)
+        self.files = list(files)
+        self.depth = depth
+        self.threads = threads or depth
+        self.return_exceptions = return_exceptions
+        self._executor = None
+        self._pending = None
+
+    def __iter__(self):
+        from collections import deque
+        from concurrent.futures import ThreadPoolExecutor
+
+        files = iter(self.files)
+        if not self.depth:
+            for filename in files:
+                yield filename, self._result(_read_file_bytes, filename)
+            return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.threads)
+        pending = self._pending = deque()
+        for filename in files:
+            pending.append((filename, self._executor.submit(_read_file_bytes, filename)))
+            if len(pending) == self.depth:
+                break
+        while pending:
+            filename, future = pending.popleft()
+            for next_filename in files:
+                pending.append((next_filename, self._executor.submit(_read_file_bytes, next_filename)))
+                break
+            yield filename, self._result(future.result)
+
+    def _result(self, function, *args):
+        """Return `function(*args)`, or the exception raised with `return_exceptions`"""
+        try:
+            return function(*args)
+        except Exception as e:
+            if not self.return_exceptions:
+                raise
+            return e
+
+    def __len__(self):
+        return len(self.files)
+
+    def close(self):
+        """Stop the reading threads, files not yet read are cancelled"""
+        if self._executor is not None:
+            for _, future in self._pending or ():
+                future.cancel()
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({len(self.files)} files, depth={self.depth}, threads={self.threads})"
+
+
+class GFFRecord:
+    """
+    One feature of a GFF3 file, as yield by :meth:`ParseGFF.parseGFF3`.
+
+    A light ``__slots__`` class with the API of a namedtuple: fields are read by name (``record.seqid``) or by
+    position (``record[0]``), and ``_fields``, ``_make``, ``_asdict`` and ``_replace`` are available. Records
+    compare equal to the tuple of their fields.
+
+    `attributes` can be given as the raw column 9 string: it is then parsed into a dict only on first access, so
+    passes reading only the other columns never pay for it.
+
+    Arguments:
+        seqid (str): first column of gff3
+        source (str): second column of gff3
+        type (str): third column of gff3 contain type
+        start (int): start position
+        end (int): end position
+        score (float): score
+        strand (str): DNA brin
+        phase (str): phase
+        attributes (dict or str): dict() with key corresponding to GFFAttributes, or the raw attribute column
+        seq (str): if fasta load can add sequence but by default = None
+        len (int): size of sequence (end - start)
+
+    Example:
+        >>> record = GFFRecord("chr1", "maker", "gene", 46, 6942, None, "+", None, {"ID": "gene_1"}, None, 6896)
+        >>> record.type, record[3]
+        ('gene', 46)
+        >>> record._replace(strand="-")
+        GFFRecord(seqid='chr1', source='maker', type='gene', start=46, end=6942, score=None, strand='-', phase=None, attributes={'ID': 'gene_1'}, seq=None, len=6896)
+    """
+
+    __slots__ = ("seqid", "source", "type", "start", "end", "score", "strand", "phase", "_attributes", "_raw",
+                 "seq", "len")
+    _fields = ("seqid", "source", "type", "start", "end", "score", "strand", "phase", "attributes", "seq", "len")
+
+    def __init__(self, seqid, source, type, start, end, score, strand, phase, attributes, seq, len):
+        self.seqid = seqid
+        self.source = source
+        self.type = type
+        self.start = start
+        self.end = end
+        self.score = score
+        self.strand = strand
+        self.phase = phase
+        if isinstance(attributes, str):
+            self._attributes = None
+            self._raw = attributes
+        else:
+            self._attributes = attributes
+            self._raw = None
+        self.seq = seq
+        self.len = len
+
+    @property
+    def attributes(self):
+        """dict of the attribute column, parsed on first access"""
+        if self._attributes is None:
+            self._attributes = _parse_gff_attributes(self._raw)
+        return self._attributes
+
+    @attributes.setter
+    def attributes(self, attributes):
+        self._attributes = attributes
+        self._raw = None
+
+    def _row(self):
+        """Return the tuple of fields with the attribute column still raw if it was not parsed yet"""
+        attributes = self._raw if self._raw is not None else self._attributes
+        return (self.seqid, self.source, self.type, self.start, self.end, self.score, self.strand, self.phase,
+                attributes, self.seq, self.len)
+
+    @classmethod
+    def _make(cls, iterable):
+        """Make a new record from a sequence or iterable of the 11 fields"""
+        return cls(*iterable)
+
+    def _asdict(self):
+        """Return a new dict which maps field names to their values"""
+        return {field: getattr(self, field) for field in self._fields}
+
+    def _replace(self, **kwargs):
+        """Return a new record replacing specified fields with new values"""
+        values = self._asdict()
+        for field, value in kwargs.items():
+            if field not in values:
+                raise ValueError(f"ERROR: got unexpected field name {field!r}")
+            values[field] = value
+        return self.__class__(**values)
+
+    def __iter__(self):
+        return (getattr(self, field) for field in self._fields)
+
+    def __getitem__(self, index):
+        return tuple(self)[index]
+
+    def __len__(self):
+        return len(self._fields)
+
+    def __eq__(self, other):
+        if isinstance(other, (GFFRecord, tuple)):
+            return tuple(self) == tuple(other)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(tuple(self))
+
+    def __reduce__(self):
+        if self._raw is not None and self._attributes is not None:
+            return self.__class__, self._row(), self._attributes
+        return self.__class__, self._row()
+
+    def __setstate__(self, attributes):
+        self._attributes = attributes
+
+    def __repr__(self):
+        values = ", ".join(f"{field}={getattr(self, field)!r}" for field in self._fields)
+        return f"{self.__class__.__name__}({values})"
 
 
 class ParseGFF:
@@ -400,6 +3146,18 @@ class ParseGFF:
     len         size of sequence
     ==========  ===========================================================
 
+    The attribute column is parsed only when ``record.attributes`` is first read, so passes filtering on the
+    other columns never parse it. With `attribute_keys`, only these keys are extracted, eagerly, and
+    ``record.attributes`` contains only them.
+
+    With a reference `fasta_file`, :meth:`add_sequences` fill the `seq` of features and :meth:`spliced_sequences`
+    extract the spliced CDS, transcripts or proteins.
+
+    Arguments:
+        filename (str): a path to GFF3 file, can be gzip compressed
+        attribute_keys (list, optional): the attribute keys to extract (ex: ["ID", "Parent"]), default all
+        fasta_file (str, optional): a path to the reference fasta file (plain or BGZF), indexed with :class:`FastaIndex`
+
     Example:
         >>> objGFF = ParseGFF(gffFile)
         >>> for record in objGFF.parseGFF3():
@@ -409,56 +3167,722 @@ class ParseGFF:
 
     """
 
-    def __init__(self, filename):
-        from collections import namedtuple
-        # Initialized GeneInfo named tuple. Note: namedtuple is immutable
+    def __init__(self, filename, attribute_keys=None, fasta_file=None):
         self.filename = filename
-        self.gffInfoFields = ["seqid", "source", "type", "start", "end", "score", "strand", "phase", "attributes",
-                              "seq", "len"]
-        self.GFFRecord = namedtuple("GFFRecord", self.gffInfoFields)
+        self.attribute_keys = None if attribute_keys is None else list(attribute_keys)
+        self.fasta_file = fasta_file
+        self.gffInfoFields = list(GFFRecord._fields)
+        self.GFFRecord = GFFRecord
 
     @staticmethod
-    def parseGFFAttributes(self, attributeString):
-        """Parse the GFF3 attribute column and return a dict"""
-        import urllib
-        if attributeString == ".": return {}
-        ret = {}
-        for attribute in attributeString.split(";"):
-            key, value = attribute.split("=")
-            ret[urllib.parse.unquote(key)] = urllib.parse.unquote(value)
-        return ret
-
-    def parseGFF3(self):
+    def parseGFFAttributes(attributeString):
+        """Parse the GFF3 attribute column and return a dict, empty attributes (ie trailing ";") are skipped"""
+        return _parse_gff_attributes(attributeString)
+
+    def parseGFF3(self, cache=None, workers=1, types=None, seqids=None, region=None, attributes=None):
         """
         A minimalistic GFF3 format parser.
         Yields objects that contain info about a single GFF3 feature.
 
-        Supports transparent gzip decompression.
+        Supports transparent gzip decompression. Blank lines are skipped and parsing stop at the "##FASTA"
+        section. Records are :class:`GFFRecord`, built positionally with percent-decoding only on values
+        containing "%".
+
+        With `workers`, the file is cut at line ends in byte ranges parsed on `workers` processes, and records are
+        still yield in file order (use ``list()`` to merge them). A gzip file can not be cut, it is read by a
+        single reader which send batches of lines to the processes.
+
+        The filters `types`, `seqids`, `region` and `attributes` are checked on the raw columns of each line,
+        only the selected lines are decoded into records. A filtered parse is not stored on the `cache`, but a
+        cached file is filtered.
+
+        Arguments:
+            cache (ParseCache, optional): a :class:`ParseCache` (or True for the default one) to load the parsed
+                                          records instead of parsing the file again
+            workers (int, optional): number of processes used to parse the file. Default=1
+            types (list, optional): keep only the features of these types (ex: ["CDS"])
+            seqids (list, optional): keep only the features on these seqids
+            region (str or tuple, optional): keep only the features overlapping a region "seqid:start-end" or
+                                             (seqid, start, end), 1-based and inclusive
+            attributes (dict, optional): keep only the features with these attribute values, a value can be a
+                                         str, a list of accepted values or None to only require the key
+                                         (ex: {"gene_biotype": "protein_coding"})
+
+        Raises:
+             ValueError: If a feature line has not 9 columns.
+             ValueError: If `workers` is not a positive integer.
+
+        Example:
+            >>> for record in ParseGFF("annotation.gff3").parseGFF3(types=["CDS"], region="chr2:10000-250000"):
+            ...     print(record.attributes["Parent"], record.start, record.end)
         """
-        import gzip
-        import urllib
-        # Parse with transparent decompression
-        open_fn = gzip.open if self.filename.endswith(".gz") else open
-        with open_fn(self.filename) as in_file:
-            for line in in_file:
-                if line.startswith("#"): continue
-                parts = line.strip().split("\t")
-                # If this fails, the file format is not standard-compatible
-                assert len(parts) == len(self.gffInfoFields) - 2
-                # Normalize data
-                normalizedInfo = {
-                        "seqid"     : None if parts[0] == "." else urllib.parse.unquote(parts[0]),
-                        "source"    : None if parts[1] == "." else urllib.parse.unquote(parts[1]),
-                        "type"      : None if parts[2] == "." else urllib.parse.unquote(parts[2]),
-                        "start"     : None if parts[3] == "." else int(parts[3]),
-                        "end"       : None if parts[4] == "." else int(parts[4]),
-                        "len"       : None if parts[4] == "." and parts[3] == "." else int(parts[4]) - int(parts[3]),
-                        "score"     : None if parts[5] == "." else float(parts[5]),
-                        "strand"    : None if parts[6] == "." else urllib.parse.unquote(parts[6]),
-                        "phase"     : None if parts[7] == "." else urllib.parse.unquote(parts[7]),
-                        "seq"       : None,
-                        "attributes": self.parseGFFAttributes(parts[8])
-                }
-                # Alternatively, you can emit the dictionary here, if you need mutability:
-                #	yield normalizedInfo
-                yield self.GFFRecord(**normalizedInfo)
+        _check_workers(workers)
+        filters = _gff_filters(types, seqids, region, attributes)
+        cache = _get_cache(cache)
+        if cache is not None:
+            buffer = cache.load(self.filename, "gff")
+            rows = None if buffer is None else _gff_cache_2_rows(buffer)
+            if rows is not None:
+                for row in rows:
+                    record = GFFRecord(*row)
+                    if filters is not None and not _gff_record_selected(record, filters):
+                        continue
+                    if self.attribute_keys is not None:
+                        record._attributes = _extract_gff_attributes(row[8], self.attribute_keys)
+                    yield record
+                return
+            if filters is not None:
+                cache = None
+            rows = []
+        if workers > 1:
+            for rows_chunk, chunk_attributes in _iter_gff3_chunks(self.filename, workers, _parse_gff3_lines,
+                                                                  self.attribute_keys, filters):
+                for record in _gff3_rows_2_records(rows_chunk, chunk_attributes):
+                    if cache is not None:
+                        rows.append(record._row())
+                    yield record
+        else:
+            # Parse with transparent decompression
+            with _open_fasta(self.filename, text=True) as in_file:
+                for record in _iter_gff3_records(in_file, self.filename, self.attribute_keys, filters=filters):
+                    if cache is not None:
+                        rows.append(record._row())
+                    yield record
+        if cache is not None:
+            cache.store(self.filename, "gff", _gff_rows_2_cache(rows))
+
+    def _contig_pieces(self, pieces):
+        """
+        Yield (piece key, sequence) of `pieces`, a list of (key, seqid, start, end) features, the reference is read
+        once by seqid (from the first start to the last end of its pieces).
+        """
+        if self.fasta_file is None:
+            raise ValueError("ERROR: no fasta_file given to ParseGFF, can not extract sequences")
+        by_seqid = {}
+        for piece in pieces:
+            by_seqid.setdefault(piece[1], []).append(piece)
+        with FastaIndex(self.fasta_file) as index:
+            for seqid, seqid_pieces in by_seqid.items():
+                first = min(piece[2] for piece in seqid_pieces)
+                last = max(piece[3] for piece in seqid_pieces)
+                contig = index.fetch(seqid, first, last)
+                for key, _, start, end in seqid_pieces:
+                    yield key, contig[start - first:end - first + 1]
+
+    def add_sequences(self, records=None, types=None):
+        """
+        Fill the `seq` of features with their sequence on `fasta_file`, reverse complemented on the "-" strand.
+
+        Features are grouped by seqid so each contig is read once with a :class:`FastaIndex` (``.fai`` built if
+        missing).
+
+        Arguments:
+            records (list, optional): the :class:`GFFRecord` to fill, default all the features of the file
+            types (list, optional): only fill the features of these types (ex: ["gene"])
+
+        Returns:
+            :class:`list`: the records
+
+        Raises:
+             ValueError: If the :class:`ParseGFF` has no `fasta_file`.
+             KeyError: If a seqid is not in `fasta_file`.
+        """
+        records = list(self.parseGFF3() if records is None else records)
+        pieces = [(row, record.seqid, record.start, record.end) for row, record in enumerate(records)
+                  if record.start is not None and record.end is not None and (types is None or record.type in types)]
+        for row, sequence in self._contig_pieces(pieces):
+            if records[row].strand == "-":
+                sequence = sequence.translate(_REVCOMP)[::-1]
+            records[row].seq = sequence
+        return records
+
+    def spliced_sequences(self, types=("CDS",), translate=False, table=1, records=None):
+        """
+        Return the spliced sequences by transcript, like gffread: the features of `types` are grouped on their
+        Parent (or their ID without Parent), joined in position order and reverse complemented on the "-" strand.
+
+        Features are grouped by seqid so each contig is read once with a :class:`FastaIndex` (``.fai`` built if
+        missing). With `translate`, the phase of the first CDS is skipped and the sequence is translated with
+        Biopython.
+
+        Notes:
+            function need modules:
+
+            - BioPython (with `translate`)
+
+        Arguments:
+            types (list, optional): the feature types to splice, ie ("exon",) for transcripts. Default=("CDS",)
+            translate (bool, optional): if True return the protein sequences. Default=False
+            table (int or str, optional): the translation table (NCBI number or name). Default=1
+            records (list, optional): the :class:`GFFRecord` to use, default all the features of the file
+
+        Returns:
+            :class:`dict`: the sequence (``str``) by transcript ID, in file order (write them with :func:`dict_2_fasta`)
+
+        Raises:
+             ValueError: If the :class:`ParseGFF` has no `fasta_file`.
+             KeyError: If a seqid is not in `fasta_file`.
+
+        Example:
+            >>> proteins = ParseGFF("annotation.gff3", fasta_file="genome.fasta").spliced_sequences(translate=True)
+            >>> dict_2_fasta(proteins, "proteins.fasta")
+        """
+        records = self.parseGFF3() if records is None else records
+        transcripts = {}
+        pieces = []
+        for record in records:
+            if record.type not in types or record.start is None or record.end is None:
+                continue
+            if record._raw is not None:
+                feature_id, parents = _gff_id_parent(record._raw)
+            else:
+                feature_id, parents = record.attributes.get("ID"), record.attributes.get("Parent")
+            row = len(pieces)
+            pieces.append((row, record.seqid, record.start, record.end))
+            for transcript_id in (parents.split(",") if parents else [feature_id or f"{record.seqid}:{record.start}"]):
+                transcripts.setdefault(transcript_id, []).append((record.start, row, record.strand, record.phase))
+        sequences = dict(self._contig_pieces(pieces))
+
+        spliced = {}
+        for transcript_id, transcript_pieces in transcripts.items():
+            transcript_pieces.sort()
+            sequence = "".join(sequences[row] for _, row, _, _ in transcript_pieces)
+            minus = transcript_pieces[0][2] == "-"
+            if minus:
+                sequence = sequence.translate(_REVCOMP)[::-1]
+            if translate:
+                from Bio.Seq import Seq
+                phase = transcript_pieces[-1 if minus else 0][3]
+                sequence = sequence[int(phase or 0):]
+                sequence = str(Seq(sequence[:len(sequence) - len(sequence) % 3]).translate(table=table))
+            spliced[transcript_id] = sequence
+        return spliced
+
+    def columns(self, workers=1):
+        """
+        Return the features as a :class:`GFFColumns`: typed NumPy columns and category codes, without building
+        one :class:`GFFRecord` by feature.
+
+        Arguments:
+            workers (int, optional): number of processes used to parse the file (like :meth:`parseGFF3`). Default=1
+
+        Raises:
+             ValueError: If a feature line has not 9 columns.
+             ValueError: If `workers` is not a positive integer.
+        """
+        _check_workers(workers)
+        if workers > 1:
+            return GFFColumns(*_concat_gff3_columns(_iter_gff3_chunks(self.filename, workers, _parse_gff3_columns)))
+        with _open_fasta(self.filename, text=True) as in_file:
+            return GFFColumns(*_parse_gff3_columns(in_file, self.filename))
+
+    def hierarchy(self, workers=1):
+        """
+        Return the :class:`GFFHierarchy` of the features, linked on their ID and Parent attributes.
+
+        Arguments:
+            workers (int, optional): number of processes used to parse the file (like :meth:`parseGFF3`). Default=1
+        """
+        return GFFHierarchy(self.parseGFF3(workers=workers))
+
+    def index(self, types=None):
+        """
+        Return a :class:`GFFIndex` of the features for overlap, point and nearest feature queries.
+
+        Arguments:
+            types (list, optional): the feature types to index (ex: ["gene"]), default all
+        """
+        return GFFIndex(self, types)
+
+
+class GFFIndex:
+    """
+    Interval index of GFF3 features for overlap, point and nearest feature queries.
+
+    For each seqid, features are stored on a nested containment list (NCList): the features contained by no other
+    on a top sublist, and each feature pointing to the sublist of the features it contains. Features of a sublist
+    are not nested, so a binary search find the first one overlapping a query and the following ones are read
+    until one start after the query end: a query cost O(log n + k) by nesting level reached, whatever the length
+    of the features (a chromosome long "region" feature does not slow it down). :meth:`count_overlaps` answer
+    arrays of queries with two vectorized binary searches on NumPy arrays of the starts and the sorted ends.
+
+    Coordinates are the GFF ones: 1-based and inclusive.
+
+    Notes:
+        class need modules:
+
+        - bisect
+        - numpy
+
+    Arguments:
+        gff (ParseGFF or str or list): a :class:`ParseGFF`, a path to GFF3 file or an iterable of :class:`GFFRecord`
+        types (list, optional): the feature types to index (ex: ["gene"]), default all
+
+    Example:
+        >>> index = ParseGFF("annotation.gff3").index(types=["gene"])
+        >>> [record.attributes["ID"] for record in index.overlap("chr1", 10000, 20000)]
+        ['gene_3', 'gene_4']
+        >>> index.nearest("chr1", 52000).attributes["ID"]
+        'gene_12'
+        >>> index.count_overlaps("chr1", [10000, 52000], [20000, 52000])
+        array([2, 0])
+    """
+
+    def __init__(self, gff, types=None):
+        import numpy as np
+
+        if isinstance(gff, str) or hasattr(gff, "as_posix"):
+            gff = ParseGFF(str(gff))
+        records = gff.parseGFF3() if isinstance(gff, ParseGFF) else gff
+        types = None if types is None else set(types)
+
+        by_seqid = {}
+        for record in records:
+            if record.start is None or record.end is None or (types is not None and record.type not in types):
+                continue
+            by_seqid.setdefault(record.seqid, []).append(record)
+
+        self._records = {}
+        self._starts = {}
+        self._nclists = {}
+        self._start_array = {}
+        self._sorted_end_array = {}
+        for seqid, seqid_records in by_seqid.items():
+            seqid_records.sort(key=lambda record: (record.start, record.end))
+            self._records[seqid] = seqid_records
+            self._starts[seqid] = [record.start for record in seqid_records]
+            ends = [record.end for record in seqid_records]
+            self._nclists[seqid] = _build_nclist(self._starts[seqid], ends)
+            self._start_array[seqid] = np.array(self._starts[seqid], dtype=np.int64)
+            self._sorted_end_array[seqid] = np.sort(np.array(ends, dtype=np.int64))
+
+    def _overlap_indexes(self, seqid, start, end):
+        """Return the sorted list of indexes of the `seqid` features overlapping `start`-`end`"""
+        from bisect import bisect_left
+
+        if seqid not in self._nclists:
+            return []
+        starts, ends, flat_indexes, children, offsets = self._nclists[seqid]
+        indexes = []
+        pending = [0]
+        while pending:
+            sublist = pending.pop()
+            position = bisect_left(ends, start, offsets[sublist], offsets[sublist + 1])
+            while position < offsets[sublist + 1] and starts[position] <= end:
+                indexes.append(flat_indexes[position])
+                if children[position] != -1:
+                    pending.append(children[position])
+                position += 1
+        indexes.sort()
+        return indexes
+
+    def overlap(self, seqid, start, end):
+        """
+        Return the list of features of `seqid` overlapping `start`-`end`, sorted on start.
+
+        Arguments:
+            seqid (str): the sequence name
+            start (int): the region start (1-based)
+            end (int): the region end (inclusive)
+
+        Raises:
+             ValueError: If `start` is greater than `end`.
+        """
+        if start > end:
+            raise ValueError(f'ERROR: start "{start}" is greater than end "{end}"')
+        records = self._records.get(seqid)
+        return [records[index] for index in self._overlap_indexes(seqid, start, end)]
+
+    def at(self, seqid, position):
+        """Return the list of features of `seqid` containing `position` (1-based), sorted on start"""
+        return self.overlap(seqid, position, position)
+
+    def nearest(self, seqid, start, end=None):
+        """
+        Return the feature of `seqid` nearest to `start`-`end` (or to the position `start`).
+
+        An overlapping feature (the first on start) is returned first, else the feature with the smallest distance,
+        the one before the region on ties. Return None if `seqid` has no feature.
+
+        Arguments:
+            seqid (str): the sequence name
+            start (int): the region start or the position (1-based)
+            end (int, optional): the region end (inclusive), default `start`
+        """
+        from bisect import bisect_left, bisect_right
+
+        end = start if end is None else end
+        if seqid not in self._starts:
+            return None
+        records = self._records[seqid]
+        overlapping = self._overlap_indexes(seqid, start, end)
+        if overlapping:
+            return records[overlapping[0]]
+        starts = self._starts[seqid]
+        last = bisect_right(starts, end)
+        # nothing overlap, so the feature ending the nearest before the region is the top level feature (the ends
+        # of the contained ones are not greater) with the greatest end before `start`
+        _, flat_ends, flat_indexes, _, offsets = self._nclists[seqid]
+        top_before = bisect_left(flat_ends, start, 0, offsets[1]) - 1
+        after = last if last < len(starts) else None
+        if top_before == -1:
+            return records[after]
+        if after is None or start - flat_ends[top_before] <= starts[after] - end:
+            return records[flat_indexes[top_before]]
+        return records[after]
+
+    def count_overlaps(self, seqid, starts, ends):
+        """
+        Return the number of features of `seqid` overlapping each region, for arrays of regions.
+
+        Computed with two vectorized binary searches: the features starting before each region end, less the
+        features ending before its start.
+
+        Arguments:
+            seqid (str): the sequence name
+            starts (list or numpy.ndarray): the regions starts (1-based)
+            ends (list or numpy.ndarray): the regions ends (inclusive)
+
+        Returns:
+            :class:`numpy.ndarray`: the number of overlapping features by region
+        """
+        import numpy as np
+
+        starts = np.asarray(starts, dtype=np.int64)
+        ends = np.asarray(ends, dtype=np.int64)
+        if seqid not in self._starts:
+            return np.zeros(len(starts), dtype=np.int64)
+        return (self._start_array[seqid].searchsorted(ends, "right") -
+                self._sorted_end_array[seqid].searchsorted(starts, "left"))
+
+    @property
+    def seqids(self):
+        """list of the indexed seqids"""
+        return list(self._records)
+
+    def __len__(self):
+        return sum(len(records) for records in self._records.values())
+
+    def __contains__(self, seqid):
+        return seqid in self._records
+
+    def __iter__(self):
+        for records in self._records.values():
+            yield from records
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({len(self)} features on {len(self._records)} seqids)"
+
+
+class GFFColumns:
+    """
+    Columnar view of the features of a GFF3 file, as returned by :meth:`ParseGFF.columns`.
+
+    Each column is a NumPy array with one value by feature (row), in file order, so filters and aggregations over
+    millions of features are vectorized. seqid, source and type are category codes (index on
+    ``categories[field]``), the attribute column is kept raw and parsed by row on demand.
+
+    ==========  ========  ===========================================================
+    column      dtype     infos
+    ==========  ========  ===========================================================
+    seqid       int32     code of the first column, -1 if "."
+    source      int32     code of the second column, -1 if "."
+    type        int32     code of the third column, -1 if "."
+    start       int64     start position, -1 if "."
+    end         int64     end position, -1 if "."
+    score       float32   score, NaN if "."
+    strand      int8      1 for "+", -1 for "-", 0 for "." or "?"
+    phase       int8      phase, -1 if "."
+    ==========  ========  ===========================================================
+
+    Indexing with a boolean mask, an array of rows or a slice return a new :class:`GFFColumns` of the selected
+    rows, indexing with an integer return the :class:`GFFRecord` of the row.
+
+    Notes:
+        class need modules:
+
+        - numpy
+
+    Arguments:
+        columns (dict): the NumPy column arrays by name
+        categories (dict): the list of names of "seqid", "source" and "type" codes
+        attributes (list): the raw attribute column by row
+
+    Example:
+        >>> columns = ParseGFF("annotation.gff3").columns()
+        >>> genes = columns[columns.type == columns.code("type", "gene")]
+        >>> len(genes), int((genes.end - genes.start + 1).sum())
+        (14562, 38712345)
+        >>> np.bincount(columns.seqid, minlength=len(columns.categories["seqid"]))
+        array([2231, 1874, 1520])
+        >>> genes.attributes(0)["ID"]
+        'gene_1'
+    """
+
+    _categorical = ("seqid", "source", "type")
+    _fields = ("seqid", "source", "type", "start", "end", "score", "strand", "phase")
+
+    def __init__(self, columns, categories, attributes):
+        import numpy as np
+
+        self.seqid = columns["seqid"]
+        self.source = columns["source"]
+        self.type = columns["type"]
+        self.start = columns["start"]
+        self.end = columns["end"]
+        self.score = columns["score"]
+        self.strand = columns["strand"]
+        self.phase = columns["phase"]
+        self.categories = {field: list(categories[field]) for field in self._categorical}
+        if isinstance(attributes, np.ndarray):
+            self.attribute_strings = attributes
+        else:
+            self.attribute_strings = np.empty(len(attributes), dtype=object)
+            self.attribute_strings[:] = attributes
+
+    def code(self, field, name):
+        """Return the code of `name` on the categorical column `field` ("seqid", "source" or "type"), -1 if absent"""
+        try:
+            return self.categories[field].index(name)
+        except ValueError:
+            return -1
+
+    def names(self, field):
+        """Return the object array of the names of the categorical column `field` by row (None for ".")"""
+        import numpy as np
+
+        names = np.empty(len(self.categories[field]) + 1, dtype=object)
+        names[:-1] = self.categories[field]
+        return names[getattr(self, field)]
+
+    def attributes(self, row):
+        """Return the attribute dict of `row`"""
+        return _parse_gff_attributes(self.attribute_strings[row])
+
+    def attribute(self, key):
+        """Return the object array of the value of attribute `key` by row (None if absent)"""
+        import numpy as np
+
+        values = np.empty(len(self), dtype=object)
+        values[:] = [_extract_gff_attributes(attributes, (key,)).get(key) for attributes in self.attribute_strings]
+        return values
+
+    def record(self, row):
+        """Return `row` as a :class:`GFFRecord`"""
+        import math
+
+        start = int(self.start[row])
+        end = int(self.end[row])
+        score = float(self.score[row])
+        strand = int(self.strand[row])
+        phase = int(self.phase[row])
+        seqid, source, feature_type = (int(getattr(self, field)[row]) for field in self._categorical)
+        return GFFRecord(None if seqid == -1 else self.categories["seqid"][seqid],
+                         None if source == -1 else self.categories["source"][source],
+                         None if feature_type == -1 else self.categories["type"][feature_type],
+                         None if start == -1 else start,
+                         None if end == -1 else end,
+                         None if math.isnan(score) else score,
+                         {1: "+", -1: "-"}.get(strand),
+                         None if phase == -1 else str(phase),
+                         self.attribute_strings[row],
+                         None,
+                         None if start == -1 or end == -1 else end - start)
+
+    def to_structured(self):
+        """Return the columns as one NumPy structured array (without the attribute column)"""
+        import numpy as np
+
+        array = np.empty(len(self), dtype=[(field, getattr(self, field).dtype) for field in self._fields])
+        for field in self._fields:
+            array[field] = getattr(self, field)
+        return array
+
+    def __getitem__(self, index):
+        import numbers
+
+        if isinstance(index, numbers.Integral) and not isinstance(index, bool):
+            return self.record(index)
+        columns = {field: getattr(self, field)[index] for field in self._fields}
+        return self.__class__(columns, self.categories, self.attribute_strings[index])
+
+    def __len__(self):
+        return len(self.start)
+
+    def __iter__(self):
+        return (self.record(row) for row in range(len(self)))
+
+    def __repr__(self):
+        types = ", ".join(self.categories["type"][:5]) + (", ..." if len(self.categories["type"]) > 5 else "")
+        return f"{self.__class__.__name__}({len(self)} features, types: {types})"
+
+
+class GFFHierarchy:
+    """
+    Parent/children tree of GFF3 features (gene → mRNA → exon/CDS ...), linked on the ID and Parent attributes.
+
+    Features are indexed by ID in one pass and the Parent links are resolved after it, so building is linear and
+    features can be listed before their parent. A feature with many parents (``Parent=mRNA1,mRNA2``) is a child of
+    each of them, children are kept in file order and features sharing an ID (ie a CDS on many lines) are all
+    returned by :meth:`get_all`. ID and Parent are read without parsing the other attributes, and links are stored
+    in NumPy arrays (children of each feature contiguous) so millions of features do not make millions of lists.
+
+    Features whose Parent is not in the file are listed on `orphans` and are roots.
+
+    Notes:
+        class need modules:
+
+        - numpy
+
+    Arguments:
+        gff (ParseGFF or str or list): a :class:`ParseGFF`, a path to GFF3 file or an iterable of :class:`GFFRecord`
+
+    Example:
+        >>> hierarchy = ParseGFF("annotation.gff3").hierarchy()
+        >>> for gene, features in hierarchy.iter_genes():
+        ...     print(gene.attributes["ID"], [feature.type for feature in features])
+        gene_1 ['mRNA', 'exon', 'CDS', 'exon', 'CDS']
+        gene_2 ['mRNA', 'exon', 'CDS', 'mRNA', 'exon', 'CDS']
+        >>> [child.attributes["ID"] for child in hierarchy.children("gene_2")]
+        ['mRNA_2.1', 'mRNA_2.2']
+    """
+
+    def __init__(self, gff):
+        from array import array
+        import numpy as np
+
+        if isinstance(gff, str) or hasattr(gff, "as_posix"):
+            gff = ParseGFF(str(gff))
+        records = gff.parseGFF3() if isinstance(gff, ParseGFF) else gff
+
+        self.records = records = list(records)
+        self._rows = ids_rows = {}
+        self._duplicates = {}
+        # rows by object, so a record is found in O(1) with or without ID
+        self._record_rows = record_rows = {}
+        child_rows = array("q")
+        parent_ids = []
+        for row, record in enumerate(records):
+            record_rows[id(record)] = row
+            if record._raw is not None:
+                feature_id, parents = _gff_id_parent(record._raw)
+            else:
+                feature_id, parents = record.attributes.get("ID"), record.attributes.get("Parent")
+            if feature_id is not None:
+                if feature_id in ids_rows:
+                    self._duplicates.setdefault(feature_id, [ids_rows[feature_id]]).append(row)
+                else:
+                    ids_rows[feature_id] = row
+            if parents:
+                if "," in parents:
+                    for parent in parents.split(","):
+                        child_rows.append(row)
+                        parent_ids.append(parent)
+                else:
+                    child_rows.append(row)
+                    parent_ids.append(parents)
+
+        get_row = ids_rows.get
+        child_rows = np.array(child_rows, dtype=np.int64)
+        parent_rows = np.fromiter((get_row(parent, -1) for parent in parent_ids), dtype=np.int64,
+                                  count=len(parent_ids))
+        missing = parent_rows == -1
+        self.orphans = [records[row] for row in np.unique(child_rows[missing]).tolist()]
+        child_rows = child_rows[~missing]
+        parent_rows = parent_rows[~missing]
+        # links sorted on parent (stable, so children stay in file order) and already sorted on child
+        self._children = child_rows[np.argsort(parent_rows, kind="stable")]
+        self._children_offsets = np.zeros(len(records) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(parent_rows, minlength=len(records)), out=self._children_offsets[1:])
+        self._parents = parent_rows
+        self._parents_offsets = np.zeros(len(records) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(child_rows, minlength=len(records)), out=self._parents_offsets[1:])
+        self._children_lists = None
+
+    def _row(self, feature):
+        """Return the row of `feature` (a :class:`GFFRecord` of the hierarchy or an ID)"""
+        if isinstance(feature, str):
+            if feature not in self._rows:
+                raise KeyError(feature)
+            return self._rows[feature]
+        row = self._record_rows.get(id(feature))
+        if row is None or self.records[row] is not feature:
+            raise KeyError(feature)
+        return row
+
+    def _children_rows(self, row):
+        """Return the list of rows of the children of `row`"""
+        if self._children_lists is None:
+            # plain lists are much faster than NumPy arrays for the many small slices of a walk
+            self._children_lists = self._children.tolist(), self._children_offsets.tolist()
+        children, offsets = self._children_lists
+        return children[offsets[row]:offsets[row + 1]]
+
+    def get(self, feature_id, default=None):
+        """Return the (first) feature with ID `feature_id`, or `default`"""
+        row = self._rows.get(feature_id)
+        return default if row is None else self.records[row]
+
+    def get_all(self, feature_id):
+        """Return the list of features with ID `feature_id` (many for features on many lines)"""
+        if feature_id in self._duplicates:
+            return [self.records[row] for row in self._duplicates[feature_id]]
+        return [self.records[self._rows[feature_id]]] if feature_id in self._rows else []
+
+    def children(self, feature):
+        """Return the list of direct children of `feature` (a :class:`GFFRecord` or an ID), in file order"""
+        return [self.records[row] for row in self._children_rows(self._row(feature))]
+
+    def parents(self, feature):
+        """Return the list of parents of `feature` (a :class:`GFFRecord` or an ID)"""
+        row = self._row(feature)
+        return [self.records[parent] for parent in
+                self._parents[self._parents_offsets[row]:self._parents_offsets[row + 1]].tolist()]
+
+    def roots(self, types=None):
+        """Yield the features without parent in file order, only of `types` if set (ex: ["gene"])"""
+        import numpy as np
+
+        for row in np.flatnonzero(np.diff(self._parents_offsets) == 0).tolist():
+            record = self.records[row]
+            if types is None or record.type in types:
+                yield record
+
+    def walk(self, feature):
+        """
+        Yield ``(depth, record)`` of the descendants of `feature` (a :class:`GFFRecord` or an ID), depth first and
+        in file order, a feature with many parents is yield under each of them.
+        """
+        root = self._row(feature)
+        stack = [(1, row) for row in reversed(self._children_rows(root))]
+        path = [root]
+        while stack:
+            depth, row = stack.pop()
+            del path[depth:]
+            if row in path:
+                # cyclic Parent links
+                continue
+            path.append(row)
+            yield depth, self.records[row]
+            stack.extend((depth + 1, child) for child in reversed(self._children_rows(row)))
+
+    def iter_genes(self, types=("gene", "pseudogene")):
+        """Yield ``(gene, descendants)`` for each root feature of `types`, descendants are listed like :meth:`walk`"""
+        for record in self.roots(types):
+            yield record, [descendant for _, descendant in self.walk(record)]
+
+    def __getitem__(self, feature_id):
+        return self.records[self._row(feature_id)]
+
+    def __contains__(self, feature_id):
+        return feature_id in self._rows
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __repr__(self):
+        nb_roots = int((self._parents_offsets[1:] == self._parents_offsets[:-1]).sum())
+        return f"{self.__class__.__name__}({len(self.records)} features, {nb_roots} roots)"